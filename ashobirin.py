@@ -1,123 +1,2270 @@
 import streamlit as st
 import pandas as pd
-import plotly.express as px
+import numpy as np
 from streamlit_option_menu import option_menu
 from datetime import datetime
-import io
+import os
+import json
 import base64
+import functools
+import importlib
+import itertools
+import multiprocessing
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import closing, contextmanager
+
+# ===============================
+# UTILITAS
+# ===============================
+
+class CacheLRU:
+    """Cache LRU aman lintas thread; entri terlama dibuang melewati ``kapasitas`` atau ``anggaran`` ukuran"""
+    def __init__(self, kapasitas=32, saat_dibuang=None, ukuran=None, anggaran=None):
+        self.kapasitas = kapasitas
+        self.saat_dibuang = saat_dibuang
+        self.ukuran = ukuran
+        self.anggaran = anggaran
+        self._isi = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def ambil(self, kunci, buat):
+        """Mengembalikan nilai untuk kunci; jika belum ada, dibuat dengan buat()
+        
+        buat() dijalankan di luar kunci; jika thread lain lebih dulu mengisi
+        kunci yang sama, nilai miliknya yang dipakai.
+        """
+        with self._lock:
+            if kunci in self._isi:
+                self._isi.move_to_end(kunci)
+                return self._isi[kunci]
+        
+        nilai = buat()
+        dibuang = []
+        with self._lock:
+            nilai = self._isi.setdefault(kunci, nilai)
+            self._isi.move_to_end(kunci)
+            while self._lebih():
+                dibuang.append(self._isi.popitem(last=False))
+        self._buang(dibuang)
+        return nilai
+    
+    def intip(self, kunci):
+        """Nilai untuk kunci tanpa mengubah urutan LRU, atau None jika tidak ada"""
+        with self._lock:
+            return self._isi.get(kunci)
+    
+    def nilai(self):
+        """Salinan daftar nilai di cache, tanpa mengubah urutan LRU"""
+        with self._lock:
+            return list(self._isi.values())
+    
+    def rapikan(self):
+        """Mengeluarkan entri terlama sampai kapasitas dan anggaran terpenuhi lagi
+        
+        Dipakai jika ukuran nilai bisa bertambah setelah dimasukkan.
+        """
+        dibuang = []
+        with self._lock:
+            while self._lebih():
+                dibuang.append(self._isi.popitem(last=False))
+        self._buang(dibuang)
+    
+    def _lebih(self):
+        """True jika isi melewati kapasitas atau anggaran ukuran"""
+        if self.kapasitas is not None and len(self._isi) > self.kapasitas:
+            return True
+        if self.anggaran is None or len(self._isi) <= 1:
+            return False
+        return sum(self.ukuran(nilai) for nilai in self._isi.values()) > self.anggaran
+    
+    def kosongkan(self):
+        """Menghapus semua isi cache"""
+        with self._lock:
+            dibuang = list(self._isi.items())
+            self._isi.clear()
+        self._buang(dibuang)
+    
+    def _buang(self, entri):
+        """Memanggil saat_dibuang untuk entri yang dikeluarkan"""
+        if self.saat_dibuang is not None:
+            for kunci, nilai in entri:
+                self.saat_dibuang(kunci, nilai)
+    
+    def __len__(self):
+        return len(self._isi)
+
+class KunciFile:
+    """Kunci eksklusif antar-proses berbasis file (fcntl di POSIX, msvcrt di Windows)
+    
+    Reentrant di dalam satu proses: thread yang sama boleh masuk berulang kali.
+    Di POSIX file kunci dihapus saat dilepas agar tidak tertinggal di folder data.
+    """
+    def __init__(self, path):
+        self.path = path
+        self._f = None
+        self._kedalaman = 0
+        self._lock = threading.RLock()
+    
+    def __enter__(self):
+        self._lock.acquire()
+        if self._kedalaman == 0:
+            while True:
+                f = open(self.path, "a+b")
+                if os.name == "nt":
+                    import msvcrt
+                    f.seek(0)
+                    msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                import fcntl
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+                # Pemegang sebelumnya mungkin sudah menghapus file ini; kunci
+                # hanya sah jika path masih menunjuk ke file yang sama
+                try:
+                    if os.stat(self.path).st_ino == os.fstat(f.fileno()).st_ino:
+                        break
+                except FileNotFoundError:
+                    pass
+                f.close()
+            self._f = f
+        self._kedalaman += 1
+        return self
+    
+    def __exit__(self, *exc):
+        self._kedalaman -= 1
+        if self._kedalaman == 0:
+            if os.name == "nt":
+                import msvcrt
+                self._f.seek(0)
+                msvcrt.locking(self._f.fileno(), msvcrt.LK_UNLCK, 1)
+            else:
+                import fcntl
+                try:
+                    os.remove(self.path)
+                except FileNotFoundError:
+                    pass
+                fcntl.flock(self._f.fileno(), fcntl.LOCK_UN)
+            self._f.close()
+            self._f = None
+        self._lock.release()
+
+class KonflikVersi(Exception):
+    """Data di disk sudah diubah proses lain sejak versi yang diharapkan"""
+
+class PencatatKinerja:
+    """Pencatat durasi operasi dengan persentil bergulir (p50/p95/p99) dan ekspor teks Prometheus"""
+    def __init__(self, kapasitas=1000, file_prometheus=None, interval_tulis=15):
+        self.kapasitas = kapasitas
+        self.file_prometheus = file_prometheus
+        self.interval_tulis = interval_tulis
+        self._sampel = {}
+        self._total = {}
+        self._terakhir_tulis = 0
+        self._lock = threading.Lock()
+    
+    def catat(self, nama, durasi):
+        """Mencatat satu durasi (detik) untuk operasi `nama`"""
+        with self._lock:
+            if nama not in self._sampel:
+                self._sampel[nama] = deque(maxlen=self.kapasitas)
+                self._total[nama] = [0, 0.0]
+            self._sampel[nama].append(durasi)
+            self._total[nama][0] += 1
+            self._total[nama][1] += durasi
+            perlu_tulis = (self.file_prometheus is not None and
+                           time.monotonic() - self._terakhir_tulis >= self.interval_tulis)
+            if perlu_tulis:
+                self._terakhir_tulis = time.monotonic()
+        if perlu_tulis:
+            self.tulis_prometheus(self.file_prometheus)
+    
+    def ringkasan(self):
+        """DataFrame jumlah, rata-rata dan p50/p95/p99 (milidetik) per operasi"""
+        with self._lock:
+            sampel = {nama: list(isi) for nama, isi in self._sampel.items()}
+            total = {nama: list(isi) for nama, isi in self._total.items()}
+        baris = []
+        for nama in sorted(sampel):
+            p50, p95, p99 = np.percentile(sampel[nama], [50, 95, 99]) * 1000
+            jumlah, durasi = total[nama]
+            baris.append((nama, jumlah, durasi / jumlah * 1000, p50, p95, p99))
+        return pd.DataFrame(baris, columns=['Operasi', 'Jumlah', 'Rata-rata (ms)',
+                                            'p50 (ms)', 'p95 (ms)', 'p99 (ms)'])
+    
+    def ke_prometheus(self):
+        """Teks format eksposisi Prometheus (tipe summary)"""
+        with self._lock:
+            sampel = {nama: list(isi) for nama, isi in self._sampel.items()}
+            total = {nama: list(isi) for nama, isi in self._total.items()}
+        baris = [
+            "# HELP ashobirin_durasi_detik Durasi operasi aplikasi Masjid Ashobirin",
+            "# TYPE ashobirin_durasi_detik summary"
+        ]
+        for nama in sorted(sampel):
+            label = nama.replace("\\", "\\\\").replace('"', '\\"')
+            for q, nilai in zip(("0.5", "0.95", "0.99"),
+                                np.percentile(sampel[nama], [50, 95, 99])):
+                baris.append(f'ashobirin_durasi_detik{{operasi="{label}",quantile="{q}"}} {nilai:.6f}')
+            jumlah, durasi = total[nama]
+            baris.append(f'ashobirin_durasi_detik_sum{{operasi="{label}"}} {durasi:.6f}')
+            baris.append(f'ashobirin_durasi_detik_count{{operasi="{label}"}} {jumlah}')
+        return "\n".join(baris) + "\n"
+    
+    def tulis_prometheus(self, filename):
+        """Menulis metrik ke file teks Prometheus secara atomik"""
+        isi = self.ke_prometheus()
+        tulis_atomik(filename, lambda f: f.write(isi))
+    
+    def reset(self):
+        """Menghapus semua sampel"""
+        with self._lock:
+            self._sampel.clear()
+            self._total.clear()
+
+@st.cache_resource
+def get_pencatat_kinerja():
+    """PencatatKinerja bersama untuk semua rerun dan sesi Streamlit"""
+    return PencatatKinerja(file_prometheus=os.environ.get("ASHOBIRIN_PROMETHEUS"))
+
+def ukur_waktu(fungsi):
+    """Dekorator yang mencatat durasi setiap pemanggilan ke PencatatKinerja"""
+    nama = fungsi.__qualname__
+    
+    @functools.wraps(fungsi)
+    def pembungkus(*args, **kwargs):
+        mulai = time.perf_counter()
+        try:
+            return fungsi(*args, **kwargs)
+        finally:
+            get_pencatat_kinerja().catat(nama, time.perf_counter() - mulai)
+    return pembungkus
+
+# ===============================
+# BACKEND PENYIMPANAN
+# ===============================
+
+def tulis_atomik(filename, tulis):
+    """Menulis file secara atomik: tulis ke file sementara lalu rename"""
+    folder = os.path.dirname(os.path.abspath(filename))
+    fd, tmp = tempfile.mkstemp(dir=folder, prefix=".tmp-", suffix=os.path.basename(filename))
+    try:
+        with os.fdopen(fd, "w", newline="", encoding="utf-8") as f:
+            tulis(f)
+            f.flush()
+            os.fsync(f.fileno())
+        # mkstemp membuat file 0600; izin file lama dipertahankan
+        try:
+            os.chmod(tmp, os.stat(filename).st_mode)
+        except FileNotFoundError:
+            pass
+        os.replace(tmp, filename)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+def tambah_baris(filename, teks):
+    """Menambahkan baris ke file append-only lalu fsync
+    
+    Ekor yang terpotong akibat crash (tanpa newline) dibuang dulu agar
+    catatan baru tidak tersambung ke baris rusak dan ikut terabaikan.
+    """
+    with open(filename, "a+b") as f:
+        ukuran = f.seek(0, os.SEEK_END)
+        if ukuran:
+            f.seek(ukuran - 1)
+            if f.read(1) != b"\n":
+                f.truncate(_akhir_baris_utuh(f, ukuran))
+        f.write(teks.encode("utf-8"))
+        f.flush()
+        os.fsync(f.fileno())
+
+def _akhir_baris_utuh(f, ukuran, potongan=4096):
+    """Posisi sesudah newline terakhir dalam file, atau 0"""
+    posisi = ukuran
+    while posisi > 0:
+        mulai = max(0, posisi - potongan)
+        f.seek(mulai)
+        i = f.read(posisi - mulai).rfind(b"\n")
+        if i >= 0:
+            return mulai + i + 1
+        posisi = mulai
+    return 0
+
+def _nilai_json(nilai):
+    """Mengubah nilai numpy/pandas menjadi nilai yang bisa diserialisasi JSON"""
+    if nilai is None or (pd.api.types.is_scalar(nilai) and pd.isna(nilai)):
+        return None
+    if isinstance(nilai, datetime):
+        return nilai.strftime("%Y-%m-%d")
+    if hasattr(nilai, "item"):
+        return nilai.item()
+    return nilai
+
+def atur_sel(data, idx, kolom, nilai):
+    """Mengisi satu sel; kolom dilebarkan ke object jika tipenya tidak bisa menampung nilai"""
+    seri = data[kolom]
+    if isinstance(seri.dtype, pd.CategoricalDtype) and nilai not in seri.cat.categories:
+        data[kolom] = seri.cat.add_categories([nilai])
+    try:
+        data.at[idx, kolom] = nilai
+    except (TypeError, ValueError):
+        data[kolom] = data[kolom].astype(object)
+        data.at[idx, kolom] = nilai
+
+def _ukuran_dict(peta, sampel=100):
+    """Perkiraan memori dict (byte) dari ukuran rata-rata ``sampel`` entri pertama
+    
+    Nilai tuple/list/set ikut dihitung isinya. Sampel menjaga biaya tetap
+    kecil walaupun dict berisi ratusan ribu entri.
+    """
+    def ukuran(obj):
+        if isinstance(obj, (tuple, list, set)):
+            return sys.getsizeof(obj) + sum(map(sys.getsizeof, obj))
+        return sys.getsizeof(obj)
+    
+    contoh = list(itertools.islice(peta.items(), sampel))
+    if not contoh:
+        return sys.getsizeof(peta)
+    rata = sum(ukuran(k) + ukuran(v) for k, v in contoh) / len(contoh)
+    return int(sys.getsizeof(peta) + rata * len(peta))
+
+def _tanda_file(*nama_file):
+    """Tanda (mtime, ukuran) beberapa file untuk mendeteksi perubahan di disk"""
+    tanda = []
+    for nama in nama_file:
+        try:
+            stat = os.stat(nama)
+            tanda.append((stat.st_mtime_ns, stat.st_size))
+        except FileNotFoundError:
+            tanda.append(None)
+    return tuple(tanda)
+
+class PenyimpananData:
+    """Antarmuka backend penyimpanan yang dipakai DataManager
+    
+    ``halaman`` berbasis pandas; backend yang mampu (mis. SQLite) menimpanya.
+    """
+    def __init__(self, kunci="ID"):
+        self.kunci = kunci
+        self._tanda = None
+        # Diisi DataManager agar pemeliharaan di latar belakang berjalan di bawah kuncinya
+        self.pemicu_kompaksi = None
+    
+    def muat(self):
+        """Mengembalikan seluruh data sebagai DataFrame"""
+        raise NotImplementedError
+    
+    def simpan(self, data):
+        """Menulis ulang seluruh data"""
+        raise NotImplementedError
+    
+    def catat(self, operasi, record, data):
+        """Menyimpan satu perubahan ('tambah', 'edit', 'hapus')"""
+        raise NotImplementedError
+    
+    def catat_banyak(self, operasi, records, data):
+        """Menyimpan banyak perubahan sejenis sekaligus"""
+        for record in records:
+            self.catat(operasi, record, data)
+    
+    def tanda(self):
+        """Nilai yang berubah setiap kali isi penyimpanan berubah"""
+        raise NotImplementedError
+    
+    def tandai_tersinkron(self):
+        """Mencatat bahwa data di memori sudah sesuai dengan penyimpanan"""
+        self._tanda = self.tanda()
+    
+    def berubah(self):
+        """True jika penyimpanan diubah dari luar sejak sinkronisasi terakhir"""
+        return self.tanda() != self._tanda
+    
+    @staticmethod
+    def _saring(data, filter=None):
+        """Baris data yang cocok dengan filter {kolom: [nilai, ...]}"""
+        if data.empty:
+            return data
+        hasil = data
+        for nama, nilai in (filter or {}).items():
+            hasil = hasil[hasil[nama].isin(nilai)]
+        return hasil
+    
+    def halaman(self, data, filter=None, offset=0, batas=25, urut=None, menurun=False,
+                cari=None, kolom_cari=()):
+        """Satu potongan baris hasil filter/cari/urut beserta jumlah total baris yang cocok"""
+        hasil = self._saring(data, filter)
+        if cari and kolom_cari and not hasil.empty:
+            cocok = np.zeros(len(hasil), dtype=bool)
+            for nama in kolom_cari:
+                cocok |= hasil[nama].astype(str).str.contains(
+                    cari, case=False, regex=False, na=False).to_numpy()
+            hasil = hasil[cocok]
+        if urut is not None and not hasil.empty:
+            hasil = hasil.sort_values(urut, ascending=not menurun, kind='stable')
+        return hasil.iloc[offset:offset + batas], len(hasil)
+
+def terapkan_catatan(data, catatan, kunci="ID"):
+    """Menerapkan catatan {"op", "data"} (idempoten) ke data dalam sekali jalan"""
+    penuh = {}      # kunci -> record lengkap dari 'tambah' (upsert)
+    ubah = {}       # kunci -> kolom yang diedit pada baris yang sudah ada
+    hapus = set()
+    for c in catatan:
+        record = c["data"]
+        nilai_kunci = record[kunci]
+        if c["op"] == "tambah":
+            penuh[nilai_kunci] = dict(record)
+            ubah.pop(nilai_kunci, None)
+            hapus.discard(nilai_kunci)
+        elif c["op"] == "edit":
+            if nilai_kunci in penuh:
+                penuh[nilai_kunci].update(record)
+            elif nilai_kunci not in hapus:
+                ubah.setdefault(nilai_kunci, {}).update(record)
+        elif c["op"] == "hapus":
+            penuh.pop(nilai_kunci, None)
+            ubah.pop(nilai_kunci, None)
+            hapus.add(nilai_kunci)
+    
+    if not data.empty:
+        if hapus:
+            data = data[~data[kunci].isin(hapus)]
+        lokasi = dict(zip(data[kunci].tolist(), data.index))
+        for nilai_kunci in list(penuh):
+            if nilai_kunci in lokasi:
+                ubah[nilai_kunci] = penuh.pop(nilai_kunci)
+        for nilai_kunci, record in ubah.items():
+            idx = lokasi.get(nilai_kunci)
+            if idx is not None:
+                for kolom, nilai in record.items():
+                    atur_sel(data, idx, kolom, nilai)
+    
+    if penuh:
+        baru = pd.DataFrame(list(penuh.values()))
+        data = baru if data.empty else pd.concat([data, baru], ignore_index=True)
+    return data
+
+class PenyimpananCSV(PenyimpananData):
+    """Backend file CSV dengan jurnal append-only yang dipadatkan setiap ``batas_jurnal`` catatan"""
+    def __init__(self, filename, kunci="ID", jurnal=True, batas_jurnal=1000, kompaksi_latar=True,
+                 dtype_baca=None):
+        super().__init__(kunci)
+        self.filename = filename
+        self.dtype_baca = dtype_baca
+        self.jurnal = jurnal
+        self.batas_jurnal = batas_jurnal
+        self.kompaksi_latar = kompaksi_latar
+        self.jurnal_filename = filename + ".jurnal"
+        self.jurnal_lama_filename = filename + ".jurnal.lama"
+        self.jumlah_jurnal = 0
+        self._lock = threading.RLock()
+        self._thread_kompaksi = None
+    
+    def muat(self):
+        """Memuat data dari file CSV lalu memutar ulang jurnal"""
+        with self._lock:
+            try:
+                data = pd.read_csv(self.filename, dtype=self.dtype_baca)
+            except FileNotFoundError:
+                data = pd.DataFrame()
+            
+            if self.jurnal:
+                # Jurnal lama ada jika kompaksi sebelumnya terhenti di tengah jalan
+                data, jumlah_lama = self._putar_ulang_jurnal(data, self.jurnal_lama_filename)
+                data, self.jumlah_jurnal = self._putar_ulang_jurnal(data, self.jurnal_filename)
+                if jumlah_lama > 0:
+                    self.simpan(data)
+                elif self.jumlah_jurnal >= self.batas_jurnal:
+                    self.kompaksi(data)
+            return data
+    
+    def simpan(self, data):
+        """Menyimpan seluruh data ke file CSV (snapshot) secara atomik"""
+        with self._lock:
+            tulis_atomik(self.filename, lambda f: data.to_csv(f, index=False))
+            for nama in (self.jurnal_lama_filename, self.jurnal_filename):
+                if os.path.exists(nama):
+                    os.remove(nama)
+            self.jumlah_jurnal = 0
+            self.tandai_tersinkron()
+    
+    def catat(self, operasi, record, data):
+        """Menambahkan satu catatan perubahan ke jurnal"""
+        self.catat_banyak(operasi, [record], data)
+    
+    def catat_banyak(self, operasi, records, data):
+        """Menambahkan beberapa catatan ke jurnal dengan satu kali tulis dan fsync"""
+        if not self.jurnal:
+            self.simpan(data)
+            return
+        
+        baris = "".join(
+            json.dumps({
+                "op": operasi,
+                "data": {k: _nilai_json(v) for k, v in record.items()}
+            }, ensure_ascii=False) + "\n"
+            for record in records
+        )
+        with self._lock:
+            tambah_baris(self.jurnal_filename, baris)
+            self.jumlah_jurnal += len(records)
+            self.tandai_tersinkron()
+            perlu_kompaksi = self.jumlah_jurnal >= self.batas_jurnal
+            
+            if perlu_kompaksi and not (self.kompaksi_latar and self.pemicu_kompaksi):
+                # Tanpa pemilik data (DataManager), snapshot diambil di bawah kunci yang
+                # sama dengan tulisan jurnal sehingga tidak ada catatan yang terlewat
+                self.kompaksi(data)
+                perlu_kompaksi = False
+        
+        if perlu_kompaksi:
+            self.kompaksi_di_latar()
+    
+    def tanda(self):
+        """Tanda file snapshot dan jurnal"""
+        return _tanda_file(self.filename, self.jurnal_filename, self.jurnal_lama_filename)
+    
+    def kompaksi(self, data):
+        """Memadatkan jurnal menjadi snapshot CSV"""
+        with self._lock:
+            # Rotasi jurnal: catatan baru masuk ke jurnal kosong selama snapshot ditulis
+            if os.path.exists(self.jurnal_filename):
+                os.replace(self.jurnal_filename, self.jurnal_lama_filename)
+            snapshot = data.copy()
+            self.jumlah_jurnal = 0
+        
+        tulis_atomik(self.filename, lambda f: snapshot.to_csv(f, index=False))
+        
+        with self._lock:
+            if os.path.exists(self.jurnal_lama_filename):
+                os.remove(self.jurnal_lama_filename)
+            self.tandai_tersinkron()
+    
+    def kompaksi_di_latar(self):
+        """Menjalankan ``pemicu_kompaksi`` di thread latar belakang
+        
+        Pemicu mengambil snapshot dari data terbaru di bawah kunci pemiliknya,
+        bukan data saat kompaksi dipicu, agar tulisan di antaranya tidak hilang.
+        """
+        with self._lock:
+            if self._thread_kompaksi is not None and self._thread_kompaksi.is_alive():
+                return
+            self._thread_kompaksi = threading.Thread(target=self.pemicu_kompaksi, daemon=True)
+            self._thread_kompaksi.start()
+    
+    def tunggu_kompaksi(self):
+        """Menunggu kompaksi latar belakang selesai"""
+        thread = self._thread_kompaksi
+        if thread is not None:
+            thread.join()
+    
+    def _putar_ulang_jurnal(self, data, nama_file):
+        """Menerapkan ulang catatan jurnal ke data, mengembalikan (data, jumlah catatan)"""
+        if not os.path.exists(nama_file):
+            return data, 0
+        
+        catatan = []
+        with open(nama_file, encoding="utf-8") as f:
+            for baris in f:
+                try:
+                    catatan.append(json.loads(baris))
+                except json.JSONDecodeError:
+                    # Baris terakhir yang terpotong akibat crash diabaikan
+                    continue
+        return self._terapkan(data, catatan), len(catatan)
+    
+    def _terapkan(self, data, catatan):
+        """Menerapkan catatan jurnal (idempoten) ke data"""
+        return terapkan_catatan(data, catatan, self.kunci)
+
+class PenyimpananSQLite(PenyimpananData):
+    """Backend SQLite dengan indeks per kolom; ``sumber_csv`` dimigrasikan sekali saat dibuat"""
+    def __init__(self, filename, kolom, kunci="ID", tabel="organisasi", indeks=(), sumber_csv=None):
+        super().__init__(kunci)
+        self.filename = filename
+        self.kolom = dict(kolom)
+        self.tabel = tabel
+        self.indeks = tuple(indeks)
+        self._buat_tabel()
+        if sumber_csv is not None:
+            self.migrasi_dari_csv(sumber_csv)
+    
+    def _koneksi(self):
+        """Membuka koneksi baru (satu koneksi per operasi, aman lintas thread)"""
+        conn = sqlite3.connect(self.filename)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+    
+    def _buat_tabel(self):
+        """Membuat tabel dan indeks jika belum ada"""
+        definisi = ", ".join(
+            f'"{nama}" {tipe}' + (" PRIMARY KEY" if nama == self.kunci else "")
+            for nama, tipe in self.kolom.items()
+        )
+        with closing(self._koneksi()) as conn, conn:
+            conn.execute(f'CREATE TABLE IF NOT EXISTS "{self.tabel}" ({definisi})')
+            conn.execute('CREATE TABLE IF NOT EXISTS "_migrasi" '
+                         '(tabel TEXT PRIMARY KEY, sumber TEXT, waktu TEXT)')
+            for nama in self.indeks:
+                conn.execute(
+                    f'CREATE INDEX IF NOT EXISTS "idx_{self.tabel}_{nama}" '
+                    f'ON "{self.tabel}" ("{nama}")'
+                )
+    
+    def migrasi_dari_csv(self, sumber_csv):
+        """Migrasi satu kali dari CSV (beserta jurnalnya), mengembalikan True jika data dipindahkan
+        
+        Tabel yang sudah berisi tanpa catatan migrasi (dibuat sebelum tabel
+        ``_migrasi`` ada) dianggap sudah dimigrasikan.
+        """
+        with closing(self._koneksi()) as conn:
+            sudah = conn.execute(
+                'SELECT 1 FROM "_migrasi" WHERE tabel = ?', (self.tabel,)
+            ).fetchone() is not None
+            kosong = conn.execute(f'SELECT COUNT(*) FROM "{self.tabel}"').fetchone()[0] == 0
+        if sudah:
+            return False
+        
+        pindah = False
+        if kosong:
+            data = PenyimpananCSV(sumber_csv, kunci=self.kunci,
+                                  dtype_baca=_dtype_teks(self.kolom)).muat()
+            if not data.empty:
+                self.simpan(data)
+                pindah = True
+        with closing(self._koneksi()) as conn, conn:
+            conn.execute('INSERT OR IGNORE INTO "_migrasi" (tabel, sumber, waktu) VALUES (?, ?, ?)',
+                         (self.tabel, sumber_csv, _waktu_iso()))
+        return pindah
+    
+    def muat(self):
+        """Memuat seluruh tabel"""
+        with closing(self._koneksi()) as conn:
+            data = pd.read_sql_query(
+                f'SELECT * FROM "{self.tabel}" ORDER BY "{self.kunci}"', conn
+            )
+        return data
+    
+    def simpan(self, data):
+        """Menulis ulang seluruh tabel dalam satu transaksi"""
+        kolom = [k for k in self.kolom if k in data.columns]
+        daftar_kolom = ", ".join(f'"{k}"' for k in kolom)
+        tanda_tanya = ", ".join("?" for _ in kolom)
+        baris = [
+            tuple(_nilai_json(v) for v in row)
+            for row in data[kolom].itertuples(index=False, name=None)
+        ]
+        with closing(self._koneksi()) as conn, conn:
+            conn.execute(f'DELETE FROM "{self.tabel}"')
+            conn.executemany(
+                f'INSERT INTO "{self.tabel}" ({daftar_kolom}) VALUES ({tanda_tanya})', baris
+            )
+        self.tandai_tersinkron()
+    
+    def catat(self, operasi, record, data):
+        """Menulis satu perubahan sebagai INSERT/UPDATE/DELETE satu baris"""
+        record = {k: _nilai_json(v) for k, v in record.items()}
+        with closing(self._koneksi()) as conn, conn:
+            if operasi == "tambah":
+                kolom = ", ".join(f'"{k}"' for k in record)
+                tanda_tanya = ", ".join("?" for _ in record)
+                conn.execute(
+                    f'INSERT OR REPLACE INTO "{self.tabel}" ({kolom}) VALUES ({tanda_tanya})',
+                    tuple(record.values())
+                )
+            elif operasi == "edit":
+                ubah = {k: v for k, v in record.items() if k != self.kunci}
+                set_kolom = ", ".join(f'"{k}" = ?' for k in ubah)
+                conn.execute(
+                    f'UPDATE "{self.tabel}" SET {set_kolom} WHERE "{self.kunci}" = ?',
+                    (*ubah.values(), record[self.kunci])
+                )
+            elif operasi == "hapus":
+                conn.execute(
+                    f'DELETE FROM "{self.tabel}" WHERE "{self.kunci}" = ?',
+                    (record[self.kunci],)
+                )
+        self.tandai_tersinkron()
+    
+    def catat_banyak(self, operasi, records, data):
+        """Banyak INSERT sekaligus dengan executemany dalam satu transaksi"""
+        if operasi != "tambah" or not records:
+            super().catat_banyak(operasi, records, data)
+            return
+        
+        kolom = list(records[0])
+        daftar_kolom = ", ".join(f'"{k}"' for k in kolom)
+        tanda_tanya = ", ".join("?" for _ in kolom)
+        with closing(self._koneksi()) as conn, conn:
+            conn.executemany(
+                f'INSERT OR REPLACE INTO "{self.tabel}" ({daftar_kolom}) VALUES ({tanda_tanya})',
+                [tuple(_nilai_json(record[k]) for k in kolom) for record in records]
+            )
+        self.tandai_tersinkron()
+    
+    def tanda(self):
+        """Tanda file database beserta WAL-nya"""
+        return _tanda_file(self.filename, self.filename + "-wal")
+    
+    def _where(self, filter, cari=None, kolom_cari=()):
+        """Membangun klausa WHERE berparameter dari filter {kolom: [nilai, ...]} dan teks cari"""
+        klausa, parameter = [], []
+        for nama, nilai in (filter or {}).items():
+            nilai = [_nilai_json(v) for v in nilai]
+            if not nilai:
+                klausa.append("0")
+                continue
+            klausa.append(f'"{nama}" IN ({", ".join("?" for _ in nilai)})')
+            parameter.extend(nilai)
+        if cari and kolom_cari:
+            # LIKE di SQLite tidak membedakan huruf besar/kecil untuk ASCII
+            pola = "%" + cari.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+            klausa.append("(" + " OR ".join(f"\"{nama}\" LIKE ? ESCAPE '\\'" for nama in kolom_cari) + ")")
+            parameter.extend(pola for _ in kolom_cari)
+        where = f" WHERE {' AND '.join(klausa)}" if klausa else ""
+        return where, parameter
+    
+    def halaman(self, data, filter=None, offset=0, batas=25, urut=None, menurun=False,
+                cari=None, kolom_cari=()):
+        """Potongan baris memakai ORDER BY dan LIMIT/OFFSET di SQLite"""
+        for nama in (urut, *kolom_cari):
+            if nama is not None and nama not in self.kolom:
+                raise ValueError(f"Kolom tidak dikenal: {nama}")
+        where, parameter = self._where(filter, cari, kolom_cari)
+        order = f'"{self.kunci}"'
+        if urut is not None:
+            order = f'"{urut}" {"DESC" if menurun else "ASC"}, {order}'
+        with closing(self._koneksi()) as conn:
+            total = conn.execute(
+                f'SELECT COUNT(*) FROM "{self.tabel}"{where}', parameter
+            ).fetchone()[0]
+            potongan = pd.read_sql_query(
+                f'SELECT * FROM "{self.tabel}"{where} ORDER BY {order} LIMIT ? OFFSET ?',
+                conn, params=[*parameter, batas, offset]
+            )
+        return potongan, total
+
+def _dtype_teks(kolom):
+    """dtype untuk pd.read_csv: kolom TEXT dibaca sebagai str (mis. nol di depan Telepon tetap ada)"""
+    if kolom is None:
+        return None
+    return {nama: str for nama, tipe in kolom.items() if tipe == 'TEXT'}
+
+def buat_penyimpanan(filename, kunci="ID", kolom=None, indeks=()):
+    """Memilih backend dari ekstensi file: .db/.sqlite/.sqlite3 -> SQLite, selain itu CSV"""
+    akar, ekstensi = os.path.splitext(filename)
+    if ekstensi.lower() in (".db", ".sqlite", ".sqlite3"):
+        if kolom is None:
+            raise ValueError("Backend SQLite membutuhkan definisi kolom")
+        return PenyimpananSQLite(filename, kolom, kunci=kunci, indeks=indeks,
+                                 sumber_csv=akar + ".csv")
+    return PenyimpananCSV(filename, kunci=kunci, dtype_baca=_dtype_teks(kolom))
+
+def _waktu_iso(waktu=None):
+    """Stempel waktu ISO (presisi detik) yang bisa dibandingkan sebagai string"""
+    if waktu is None:
+        return datetime.now().isoformat(timespec="seconds")
+    return pd.Timestamp(waktu).isoformat(timespec="seconds")
+
+class RiwayatPerubahan:
+    """Riwayat delta per kolom (``.riwayat``) dengan cekpoin snapshot berkala (``.cekpoin``)
+    
+    Cekpoin ditulis bila delta sejak cekpoin terakhir melebihi snapshot-nya;
+    hanya ``maks_cekpoin`` terbaru yang disimpan.
+    """
+    def __init__(self, filename, kunci="ID", dtype_baca=None, batas_byte=1 << 20, maks_cekpoin=30):
+        self.filename = filename + ".riwayat"
+        self.folder_cekpoin = filename + ".cekpoin"
+        self.indeks_filename = os.path.join(self.folder_cekpoin, "indeks.jsonl")
+        self.kunci = kunci
+        self.dtype_baca = dtype_baca
+        self.batas_byte = batas_byte
+        self.maks_cekpoin = maks_cekpoin
+    
+    def _ukuran(self):
+        """Posisi akhir file riwayat (byte)"""
+        try:
+            return os.path.getsize(self.filename)
+        except FileNotFoundError:
+            return 0
+    
+    def daftar_cekpoin(self):
+        """Cekpoin {waktu, offset, file, ukuran} terurut dari yang terlama"""
+        try:
+            with open(self.indeks_filename, encoding="utf-8") as f:
+                baris = f.readlines()
+        except FileNotFoundError:
+            return []
+        daftar = []
+        for b in baris:
+            try:
+                daftar.append(json.loads(b))
+            except json.JSONDecodeError:
+                continue
+        return daftar
+    
+    def awal(self):
+        """Waktu cekpoin pertama (awal riwayat), atau None"""
+        daftar = self.daftar_cekpoin()
+        return pd.Timestamp(daftar[0]["waktu"]) if daftar else None
+    
+    def cekpoin(self, data):
+        """Menulis snapshot penuh data saat ini beserta posisi riwayatnya"""
+        os.makedirs(self.folder_cekpoin, exist_ok=True)
+        daftar = self.daftar_cekpoin()
+        # Nomor lanjut dari cekpoin terakhir agar tidak bentrok setelah pemangkasan
+        nomor = int(os.path.splitext(daftar[-1]["file"])[0]) + 1 if daftar else 1
+        nama = f"{nomor:06d}.csv"
+        path = os.path.join(self.folder_cekpoin, nama)
+        tulis_atomik(path, lambda f: data.to_csv(f, index=False))
+        entri = {
+            "waktu": _waktu_iso(),
+            "offset": self._ukuran(),
+            "file": nama,
+            "ukuran": os.path.getsize(path)
+        }
+        tambah_baris(self.indeks_filename, json.dumps(entri) + "\n")
+        if len(daftar) + 1 > self.maks_cekpoin:
+            self._pangkas(daftar + [entri])
+    
+    def _pangkas(self, daftar):
+        """Menghapus cekpoin terlama di luar ``maks_cekpoin`` (indeks ditulis ulang dulu)"""
+        buang, sisa = daftar[:-self.maks_cekpoin], daftar[-self.maks_cekpoin:]
+        isi = "".join(json.dumps(c) + "\n" for c in sisa)
+        tulis_atomik(self.indeks_filename, lambda f: f.write(isi))
+        for c in buang:
+            try:
+                os.remove(os.path.join(self.folder_cekpoin, c["file"]))
+            except FileNotFoundError:
+                pass
+    
+    def pastikan_dasar(self, data):
+        """Menulis cekpoin awal jika riwayat belum pernah dimulai"""
+        if not self.daftar_cekpoin():
+            self.cekpoin(data)
+    
+    def _perlu_cekpoin(self):
+        """True jika delta sejak cekpoin terakhir sudah lebih besar dari snapshot-nya"""
+        daftar = self.daftar_cekpoin()
+        if not daftar:
+            return True
+        terakhir = daftar[-1]
+        return self._ukuran() - terakhir["offset"] > max(self.batas_byte, terakhir["ukuran"])
+    
+    def catat(self, operasi, records, lama=None, data=None):
+        """Menambahkan delta kolom yang berubah ke riwayat, lalu cekpoin bila sudah waktunya"""
+        waktu = _waktu_iso()
+        baris = []
+        for i, record in enumerate(records):
+            sebelum = {k: _nilai_json(v) for k, v in lama[i].items()} if lama else {}
+            sesudah = {k: _nilai_json(v) for k, v in record.items()}
+            if operasi == "hapus":
+                ubah = [k for k in sebelum if k != self.kunci]
+            else:
+                ubah = [k for k, v in sesudah.items()
+                        if k != self.kunci and (k not in sebelum or sebelum[k] != v)]
+                if operasi == "edit" and not ubah:
+                    continue
+    
+            entri = {"waktu": waktu, "op": operasi, "data": {self.kunci: sesudah[self.kunci]}}
+            if operasi != "hapus":
+                entri["data"].update((k, sesudah[k]) for k in ubah)
+            dulu = {k: sebelum[k] for k in ubah if k in sebelum}
+            if dulu:
+                entri["lama"] = dulu
+            baris.append(json.dumps(entri, ensure_ascii=False) + "\n")
+    
+        if not baris:
+            return
+        tambah_baris(self.filename, "".join(baris))
+        if data is not None and self._perlu_cekpoin():
+            self.cekpoin(data)
+    
+    def catat_selisih(self, lama, baru):
+        """Mencatat perbedaan dua isi data utuh (mis. penulisan ulang ``save_data``) sebagai delta"""
+        k = self.kunci
+        if k not in lama.columns:
+            lama = baru.iloc[:0]
+        id_lama, id_baru = pd.Index(lama[k]), pd.Index(baru[k])
+        kolom = [c for c in baru.columns if c != k]
+        sama = id_baru[id_baru.isin(id_lama)]
+        sebelum = lama.set_index(k).reindex(index=sama, columns=kolom)
+        sesudah = baru.set_index(k).loc[sama, kolom]
+        beda = sama[(sebelum.astype(str).to_numpy() != sesudah.astype(str).to_numpy()).any(axis=1)]
+        
+        def records(df, ids):
+            return df.set_index(k).loc[ids].reset_index().to_dict('records')
+        
+        self.catat("hapus", [{k: i} for i in id_lama[~id_lama.isin(id_baru)]],
+                   records(lama, id_lama[~id_lama.isin(id_baru)]))
+        self.catat("edit", records(baru, beda), records(lama, beda))
+        self.catat("tambah", records(baru, id_baru[~id_baru.isin(id_lama)]))
+        if self._perlu_cekpoin():
+            self.cekpoin(baru)
+    
+    def perubahan(self, offset=0, sebelum=None, akhir=None):
+        """Entri riwayat mulai posisi ``offset``, berhenti di entri pada/sesudah ``sebelum``
+        
+        Jika ``akhir`` diberikan, pembacaan berhenti di posisi byte tersebut
+        (mis. offset cekpoin berikutnya).
+        """
+        batas = _waktu_iso(sebelum) if sebelum is not None else None
+        try:
+            f = open(self.filename, "rb")
+        except FileNotFoundError:
+            return
+        with f:
+            f.seek(offset)
+            posisi = offset
+            for baris in f:
+                if akhir is not None and posisi >= akhir:
+                    return
+                posisi += len(baris)
+                try:
+                    entri = json.loads(baris)
+                except json.JSONDecodeError:
+                    # Baris terakhir yang terpotong akibat crash diabaikan
+                    continue
+                if batas is not None and entri["waktu"] >= batas:
+                    return
+                yield entri
+    
+    def cekpoin_sebelum(self, waktu):
+        """Cekpoin terakhir yang ditulis sebelum ``waktu``, atau None"""
+        batas = _waktu_iso(waktu)
+        calon = [c for c in self.daftar_cekpoin() if c["waktu"] < batas]
+        return calon[-1] if calon else None
+    
+    def muat_cekpoin(self, cekpoin):
+        """Membaca snapshot milik satu cekpoin"""
+        try:
+            return pd.read_csv(os.path.join(self.folder_cekpoin, cekpoin["file"]),
+                               dtype=self.dtype_baca)
+        except pd.errors.EmptyDataError:
+            return pd.DataFrame()
+    
+    def keadaan_pada(self, waktu):
+        """Data tepat sebelum ``waktu`` (cekpoin terdekat + delta sesudahnya), atau None"""
+        cekpoin = self.cekpoin_sebelum(waktu)
+        if cekpoin is None:
+            return None
+        data = self.muat_cekpoin(cekpoin)
+        return terapkan_catatan(data, self.perubahan(cekpoin["offset"], waktu), self.kunci)
 
 # ===============================
 # KELAS DASAR MENGGUNAKAN INHERITANCE
 # ===============================
 
+# Nomor versi data unik di seluruh proses, sehingga cache berkunci versi
+# (figure, ekspor) tidak tertukar antar-tenant atau antar-instance manajer
+_nomor_versi = itertools.count(1)
+
 class DataManager:
-    """Kelas dasar untuk manajemen data"""
-    def __init__(self, filename):
+    """Kelas dasar untuk manajemen data
+    
+    Penulisan lintas proses diamankan ``transaksi()`` (kunci ``.lock`` + versi ``.meta``).
+    """
+    def __init__(self, filename, kunci="ID", penyimpanan=None, skema=None, riwayat=None):
         self.filename = filename
+        self.kunci = kunci
+        self.skema = dict(skema) if skema else None
+        self.penyimpanan = penyimpanan or buat_penyimpanan(filename, kunci)
+        self.riwayat = riwayat
+        self.penyimpanan.pemicu_kompaksi = self._kompaksi_terkunci
+        self.meta_filename = filename + ".meta"
+        self.versi = 0
+        self.versi_disk = 0
+        self._meta = None
+        self._meta_kotor = False
+        self._id_berikut_data = 1
+        self._lock = threading.RLock()
+        self._kunci_file = KunciFile(filename + ".lock")
         self.data = pd.DataFrame()
     
-    def load_data(self):
-        """Memuat data dari file CSV"""
+    def terapkan_skema(self, data):
+        """Mengubah tipe kolom sesuai skema; kategori baru ditambahkan, bilangan bulat tak valid ditolak"""
+        if not self.skema or len(data.columns) == 0:
+            return data
+        data = data.copy()
+        for kolom, tipe in self.skema.items():
+            if kolom not in data.columns or data[kolom].dtype == tipe:
+                continue
+            seri = data[kolom]
+            if isinstance(tipe, pd.CategoricalDtype):
+                lain = {str(nilai) for nilai in seri.dropna().unique()} - set(tipe.categories)
+                if lain:
+                    tipe = pd.CategoricalDtype(list(tipe.categories) + sorted(lain))
+                    self.skema[kolom] = tipe
+                data[kolom] = seri.astype(str).where(seri.notna()).astype(tipe)
+            elif str(tipe).startswith("datetime64"):
+                data[kolom] = pd.to_datetime(seri, errors='coerce').astype(tipe)
+            elif str(tipe).startswith("int"):
+                angka = pd.to_numeric(seri, errors='coerce')
+                salah = seri.notna() & ~(np.isfinite(angka) & (angka % 1 == 0))
+                if salah.any():
+                    baris = data.loc[salah, self.kunci] if self.kunci in data.columns else data.index[salah]
+                    contoh = ", ".join(f"{k}={v!r}" for k, v in zip(list(baris)[:5], seri[salah][:5]))
+                    raise ValueError(f"Kolom {kolom} berisi {int(salah.sum())} nilai yang bukan "
+                                     f"bilangan bulat ({self.kunci} {contoh})")
+                data[kolom] = angka.fillna(0).astype(tipe)
+            else:
+                data[kolom] = seri.astype(tipe)
+        return data
+    
+    def _baca_meta(self):
+        """Membaca stempel versi dan ID berikutnya dari file meta"""
         try:
-            self.data = pd.read_csv(self.filename)
-        except FileNotFoundError:
-            self.data = pd.DataFrame()
+            with open(self.meta_filename, encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {"versi": 0, "id_berikut": 1}
+    
+    @contextmanager
+    def transaksi(self, versi_diharapkan=None):
+        """Konteks penulisan aman lintas thread dan proses; ``KonflikVersi`` jika ``versi_diharapkan`` berbeda"""
+        with self._lock, self._kunci_file:
+            if self._meta is not None:
+                # Transaksi bersarang ikut transaksi terluar
+                yield
+                return
+            
+            meta = self._baca_meta()
+            if versi_diharapkan is not None and meta["versi"] != versi_diharapkan:
+                raise KonflikVersi(
+                    f"Versi di disk {meta['versi']}, diharapkan {versi_diharapkan}"
+                )
+            if meta["versi"] != self.versi_disk or self.penyimpanan.berubah():
+                self.load_data()
+            if self.riwayat is not None:
+                # Cekpoin dasar baru ditulis saat file pertama kali diubah, bukan saat dibaca
+                self.riwayat.pastikan_dasar(self.data)
+            
+            self._meta = dict(meta)
+            self._meta_kotor = False
+            try:
+                yield
+                if self._meta_kotor:
+                    self._meta["versi"] = meta["versi"] + 1
+                    isi = json.dumps(self._meta)
+                    tulis_atomik(self.meta_filename, lambda f: f.write(isi))
+                    self.versi_disk = self._meta["versi"]
+            finally:
+                self._meta = None
+    
+    def alokasi_id(self, jumlah=1):
+        """Mengalokasikan ID berurutan yang naik monoton (dipanggil di dalam transaksi)"""
+        mulai = max(self._meta.get("id_berikut", 1), self._id_berikut_data)
+        self._meta["id_berikut"] = mulai + jumlah
+        self._meta_kotor = True
+        return mulai
+    
+    def _kompaksi_terkunci(self):
+        """Kompaksi backend di bawah kunci file, memakai data terbaru"""
+        with self.transaksi():
+            self.penyimpanan.kompaksi(self.data)
+    
+    @ukur_waktu
+    def load_data(self):
+        """Memuat data dari penyimpanan"""
+        with self._lock, self._kunci_file:
+            # Versi dibaca sebelum data; jika tertinggal, transaksi berikutnya memuat ulang
+            self.versi_disk = self._baca_meta()["versi"]
+            self.data = self.terapkan_skema(self.penyimpanan.muat())
+            self.penyimpanan.tandai_tersinkron()
+            self.versi = next(_nomor_versi)
+            if not self.data.empty and self.kunci in self.data.columns:
+                self._id_berikut_data = int(self.data[self.kunci].max()) + 1
+            else:
+                self._id_berikut_data = 1
     
-    def save_data(self):
-        """Menyimpan data ke file CSV"""
-        self.data.to_csv(self.filename, index=False)
+    @ukur_waktu
+    def save_data(self, versi_diharapkan=None):
+        """Menyimpan seluruh data ke penyimpanan"""
+        with self._lock, self._kunci_file:
+            meta = self._baca_meta()
+            if versi_diharapkan is not None and meta["versi"] != versi_diharapkan:
+                raise KonflikVersi(
+                    f"Versi di disk {meta['versi']}, diharapkan {versi_diharapkan}"
+                )
+            self.data = self.terapkan_skema(self.data)
+            if self.riwayat is not None:
+                # Penulisan ulang penuh dicatat sebagai delta terhadap isi di disk
+                sebelum = self.terapkan_skema(self.penyimpanan.muat())
+                self.riwayat.pastikan_dasar(sebelum)
+            self.penyimpanan.simpan(self.data)
+            if self.riwayat is not None:
+                self.riwayat.catat_selisih(sebelum, self.data)
+            meta["versi"] += 1
+            isi = json.dumps(meta)
+            tulis_atomik(self.meta_filename, lambda f: f.write(isi))
+            self.versi_disk = meta["versi"]
     
     def get_all_data(self):
         """Mengembalikan semua data"""
         return self.data
+    
+    def ukuran_memori(self):
+        """Perkiraan memori data di memori (byte)"""
+        return int(self.data.memory_usage(deep=True).sum())
+    
+    def segarkan(self):
+        """Memuat ulang data hanya jika penyimpanan berubah, mengembalikan True jika dimuat ulang"""
+        with self._lock:
+            if self._baca_meta()["versi"] == self.versi_disk and not self.penyimpanan.berubah():
+                return False
+            self.load_data()
+            return True
+    
+    def catat_perubahan(self, operasi, record, lama=None):
+        """Mencatat satu perubahan ('tambah', 'edit', 'hapus') ke penyimpanan"""
+        self.catat_perubahan_banyak(operasi, [record], None if lama is None else [lama])
+    
+    def catat_perubahan_banyak(self, operasi, records, lama=None):
+        """Mencatat banyak perubahan sejenis ke penyimpanan dalam satu kali tulis
+        
+        ``lama`` (record sebelum perubahan, untuk edit/hapus) dipakai riwayat
+        untuk menyimpan hanya kolom yang berubah.
+        """
+        with self.transaksi():
+            self.versi = next(_nomor_versi)
+            self._meta_kotor = True
+            self.penyimpanan.catat_banyak(operasi, records, self.data)
+            if self.riwayat is not None:
+                self.riwayat.catat(operasi, records, lama, self.data)
+    
+    def halaman(self, filter=None, offset=0, batas=25, urut=None, menurun=False,
+                cari=None, kolom_cari=()):
+        """(potongan baris, jumlah total) hasil filter/cari/urut, dikerjakan oleh backend"""
+        return self.penyimpanan.halaman(self.data, filter, offset, batas, urut, menurun,
+                                        cari, kolom_cari)
+
+# Skema tabel organisasi untuk backend SQLite
+KOLOM_ORGANISASI = {
+    'ID': 'INTEGER',
+    'Nama': 'TEXT',
+    'Jabatan': 'TEXT',
+    'Divisi': 'TEXT',
+    'Gaji': 'INTEGER',
+    'Telepon': 'TEXT',
+    'Tanggal_Bergabung': 'TEXT'
+}
+
+# Pilihan jabatan dan divisi yang sah (dipakai form dan validasi impor)
+DAFTAR_JABATAN = ["Ketua", "Wakil Ketua", "Sekretaris", "Bendahara", "Koordinator", "Anggota"]
+DAFTAR_DIVISI = ["Takmir", "Dakwah", "Pendidikan", "Sosial", "Remaja", "Umum"]
+
+# Gaji maksimum yang diterima impor: jauh di bawah batas int64 agar total
+# ratusan ribu anggota pun tidak meluap
+GAJI_MAKS = 10**12
+
+# Skema tipe data di memori: kategori untuk Divisi/Jabatan, Telepon sebagai teks
+SKEMA_ORGANISASI = {
+    'ID': 'int32',
+    'Nama': 'string',
+    'Jabatan': pd.CategoricalDtype(DAFTAR_JABATAN),
+    'Divisi': pd.CategoricalDtype(DAFTAR_DIVISI),
+    'Gaji': 'int64',
+    'Telepon': 'string',
+    'Tanggal_Bergabung': 'datetime64[ns]'
+}
+
+class AgregatOrganisasi:
+    """Agregat berjalan (total, jumlah, rincian per Divisi, per Jabatan dan per pasangan keduanya)
+    
+    Diperbarui O(1) oleh setiap tambah/edit/hapus sehingga kartu statistik,
+    tabel ringkasan dan input grafik tidak perlu menghitung ulang seluruh data.
+    """
+    def __init__(self):
+        self.total_gaji = 0
+        self.jumlah = 0
+        self.per_divisi = {}
+        self.per_jabatan = {}
+        self.per_divisi_jabatan = {}
+    
+    @classmethod
+    def dari_data(cls, data):
+        """Menghitung agregat dari awal (dipakai saat load dan cek konsistensi)"""
+        agregat = cls()
+        if data.empty:
+            return agregat
+        agregat.total_gaji = data['Gaji'].sum()
+        agregat.jumlah = len(data)
+        for kolom, tujuan in (('Divisi', agregat.per_divisi), ('Jabatan', agregat.per_jabatan)):
+            ringkas = data.groupby(kolom, observed=True)['Gaji'].agg(['sum', 'count'])
+            for nama, total, jumlah in ringkas.itertuples(name=None):
+                tujuan[nama] = [total, jumlah]
+        ringkas = data.groupby(['Divisi', 'Jabatan'], observed=True)['Gaji'].agg(['sum', 'count'])
+        for pasangan, total, jumlah in ringkas.itertuples(name=None):
+            agregat.per_divisi_jabatan[pasangan] = [total, jumlah]
+        return agregat
+    
+    def _rincian(self, divisi, jabatan):
+        """Pasangan (rincian, kunci) yang disentuh oleh satu anggota"""
+        return ((self.per_divisi, divisi), (self.per_jabatan, jabatan),
+                (self.per_divisi_jabatan, (divisi, jabatan)))
+    
+    def tambah(self, divisi, jabatan, gaji):
+        """Memasukkan satu anggota ke agregat"""
+        self.total_gaji += gaji
+        self.jumlah += 1
+        for tujuan, nama in self._rincian(divisi, jabatan):
+            rincian = tujuan.setdefault(nama, [0, 0])
+            rincian[0] += gaji
+            rincian[1] += 1
+    
+    def kurangi(self, divisi, jabatan, gaji):
+        """Mengeluarkan satu anggota dari agregat"""
+        self.total_gaji -= gaji
+        self.jumlah -= 1
+        for tujuan, nama in self._rincian(divisi, jabatan):
+            rincian = tujuan[nama]
+            rincian[0] -= gaji
+            rincian[1] -= 1
+            if rincian[1] == 0:
+                del tujuan[nama]
+    
+    def gabung(self, lain):
+        """Menambahkan agregat lain (mis. dari satu batch impor) ke agregat ini"""
+        self.total_gaji += lain.total_gaji
+        self.jumlah += lain.jumlah
+        for tujuan, sumber in ((self.per_divisi, lain.per_divisi),
+                               (self.per_jabatan, lain.per_jabatan),
+                               (self.per_divisi_jabatan, lain.per_divisi_jabatan)):
+            for nama, (total, jumlah) in sumber.items():
+                rincian = tujuan.setdefault(nama, [0, 0])
+                rincian[0] += total
+                rincian[1] += jumlah
+    
+    def statistik(self):
+        """Nilai untuk kartu statistik beranda"""
+        return {
+            'total_anggota': self.jumlah,
+            'total_gaji': self.total_gaji,
+            'rata_rata_gaji': self.total_gaji / self.jumlah if self.jumlah else 0,
+            'jumlah_divisi': len(self.per_divisi)
+        }
+    
+    def statistik_filter(self, divisi, jabatan):
+        """Jumlah, total dan rata-rata gaji untuk kombinasi filter Divisi x Jabatan"""
+        total, jumlah = 0, 0
+        for d in divisi:
+            for j in jabatan:
+                rincian = self.per_divisi_jabatan.get((d, j))
+                if rincian is not None:
+                    total += rincian[0]
+                    jumlah += rincian[1]
+        return {
+            'total_anggota': jumlah,
+            'total_gaji': total,
+            'rata_rata_gaji': total / jumlah if jumlah else 0
+        }
+    
+    def ringkasan(self, rincian, nama_indeks):
+        """DataFrame Total/Jumlah dari salah satu rincian, terurut berdasarkan nama"""
+        ringkas = pd.DataFrame(
+            [(nama, total, jumlah) for nama, (total, jumlah) in sorted(rincian.items())],
+            columns=[nama_indeks, 'Total', 'Jumlah']
+        )
+        return ringkas.set_index(nama_indeks)
+    
+    def sama_dengan(self, lain):
+        """True jika dua agregat bernilai sama (toleran terhadap pembulatan float)"""
+        def dekat(a, b):
+            return abs(a - b) <= 1e-6 * max(1, abs(a), abs(b))
+        
+        if self.jumlah != lain.jumlah or not dekat(self.total_gaji, lain.total_gaji):
+            return False
+        for milik, milik_lain in ((self.per_divisi, lain.per_divisi),
+                                  (self.per_jabatan, lain.per_jabatan),
+                                  (self.per_divisi_jabatan, lain.per_divisi_jabatan)):
+            if milik.keys() != milik_lain.keys():
+                return False
+            for nama, (total, jumlah) in milik.items():
+                if jumlah != milik_lain[nama][1] or not dekat(total, milik_lain[nama][0]):
+                    return False
+        return True
+
+class IndeksBitmap:
+    """Indeks bitmap (int Python) per nilai untuk kolom berkardinalitas rendah (Divisi, Jabatan)"""
+    def __init__(self, kolom):
+        self.kolom = tuple(kolom)
+        self.bitmap = {k: {} for k in self.kolom}
+    
+    @staticmethod
+    def _dari_label(label):
+        """Bitmap dari array label baris"""
+        if len(label) == 0:
+            return 0
+        bit = np.zeros(int(np.max(label)) + 1, dtype=bool)
+        bit[label] = True
+        return int.from_bytes(np.packbits(bit, bitorder='little').tobytes(), 'little')
+    
+    @staticmethod
+    def ke_label(bitmap):
+        """Array label baris yang bitnya menyala, terurut naik"""
+        if bitmap == 0:
+            return np.array([], dtype=np.int64)
+        isi = np.frombuffer(bitmap.to_bytes((bitmap.bit_length() + 7) // 8, 'little'), dtype=np.uint8)
+        return np.flatnonzero(np.unpackbits(isi, bitorder='little'))
+    
+    def bangun(self, data):
+        """Membangun ulang semua bitmap dari data"""
+        self.bitmap = {k: {} for k in self.kolom}
+        if data.empty:
+            return
+        for kolom in self.kolom:
+            for nilai, label in data.groupby(kolom, observed=True).groups.items():
+                self.bitmap[kolom][nilai] = self._dari_label(np.asarray(label))
+    
+    def tambah(self, label, nilai):
+        """Menyalakan bit baris `label` untuk nilai {kolom: nilai}"""
+        bit = 1 << int(label)
+        for kolom in self.kolom:
+            peta = self.bitmap[kolom]
+            peta[nilai[kolom]] = peta.get(nilai[kolom], 0) | bit
+    
+    def hapus(self, label, nilai):
+        """Mematikan bit baris `label` untuk nilai {kolom: nilai}"""
+        bit = 1 << int(label)
+        for kolom in self.kolom:
+            peta = self.bitmap[kolom]
+            sisa = peta.get(nilai[kolom], 0) & ~bit
+            if sisa:
+                peta[nilai[kolom]] = sisa
+            else:
+                peta.pop(nilai[kolom], None)
+    
+    def gabung(self, kolom, nilai, label):
+        """Menyalakan bit untuk banyak baris sekaligus yang bernilai sama"""
+        peta = self.bitmap[kolom]
+        peta[nilai] = peta.get(nilai, 0) | self._dari_label(np.asarray(label))
+    
+    def ukuran_memori(self):
+        """Perkiraan memori semua bitmap (byte)"""
+        return sum(sys.getsizeof(b) for peta in self.bitmap.values() for b in peta.values())
+    
+    def pilih(self, filter):
+        """Bitmap baris yang cocok dengan filter {kolom: [nilai, ...]}"""
+        hasil = None
+        for kolom, daftar in filter.items():
+            bitmap = 0
+            for nilai in daftar:
+                bitmap |= self.bitmap[kolom].get(nilai, 0)
+            hasil = bitmap if hasil is None else hasil & bitmap
+        return hasil or 0
+
+class IndeksTeks:
+    """Indeks trigram (CSR numpy + delta kecil) untuk pencarian Nama/Telepon yang toleran salah ketik"""
+    ABJAD = 37          # 0 = pemisah, 1-26 = a-z, 27-36 = 0-9
+    LEBAR_MAKS = 64
+    KOLOM = 2           # Nama, Telepon
+    BONUS_PERSIS = 0.1
+    BONUS_KATA = 0.05
+    
+    def __init__(self, batas_delta=1000):
+        self.batas_delta = batas_delta
+        self._teks = {}
+        self._indptr = np.zeros(self.ABJAD ** 3 + 1, dtype=np.int64)
+        self._dokumen = np.array([], dtype=np.int64)
+        self._jumlah = np.array([], dtype=np.int64)
+        self._kotor = set()     # label yang entrinya di indeks utama tidak berlaku lagi
+        self._baru = {}         # label -> set trigram per kolom untuk teks yang berubah sejak dibangun
+        self._larik = None      # (label, nama, telepon) untuk kueri pendek, dibangun saat diperlukan
+    
+    @staticmethod
+    def teks(nama, telepon):
+        """Pasangan (nama, telepon) ternormalisasi per baris dari Series Nama dan Telepon"""
+        nama = (nama.fillna('').astype(str).str.lower()
+                .str.replace(r'[^a-z0-9]+', ' ', regex=True).str.strip())
+        telepon = (telepon.fillna('').astype(str).str.replace(r'\D', '', regex=True)
+                   .str.replace(r'^62', '0', regex=True))
+        return list(zip(nama.tolist(), telepon.tolist()))
+    
+    @classmethod
+    def kueri(cls, teks):
+        """Normalisasi kueri: tanpa huruf dianggap nomor telepon"""
+        seri = pd.Series([teks], dtype=object)
+        kosong = pd.Series([''], dtype=object)
+        if any(c.isalpha() for c in teks):
+            return cls.teks(seri, kosong)[0][0]
+        return cls.teks(kosong, seri)[0][1]
+    
+    @classmethod
+    def _trigram(cls, daftar_teks, pengapit_kanan=True):
+        """(posisi teks, id trigram) unik untuk setiap trigram di setiap teks
+        
+        Teks diapit spasi agar awal dan akhir kata ikut menjadi trigram; kueri
+        tidak diapit di kanan sehingga kata yang belum selesai diketik tetap cocok.
+        """
+        kanan = ' ' if pengapit_kanan else ''
+        teks = [f" {t[:cls.LEBAR_MAKS]}{kanan}" for t in daftar_teks]
+        lebar = max(map(len, teks), default=0)
+        if lebar < 3:
+            return np.array([], dtype=np.int64), np.array([], dtype=np.int64)
+        
+        kode = np.array(teks, dtype=f"U{lebar}").view(np.uint32).reshape(len(teks), lebar)
+        peta = np.zeros(128, dtype=np.int64)
+        peta[ord('a'):ord('z') + 1] = np.arange(1, 27)
+        peta[ord('0'):ord('9') + 1] = np.arange(27, 37)
+        simbol = np.where(kode < 128, peta[np.minimum(kode, 127)], 0)
+        trigram = (simbol[:, :-2] * cls.ABJAD + simbol[:, 1:-1]) * cls.ABJAD + simbol[:, 2:]
+        
+        # Duplikat dalam satu teks dibuang dengan mengurutkan per baris; trigram
+        # yang berakhir dua pemisah hanya muncul dari padding teks yang lebih pendek
+        trigram = np.sort(trigram, axis=1)
+        unik = trigram % cls.ABJAD ** 2 != 0
+        unik[:, 1:] &= trigram[:, 1:] != trigram[:, :-1]
+        posisi, _ = np.nonzero(unik)
+        return posisi, trigram[unik]
+    
+    def bangun(self, label, teks):
+        """Membangun ulang indeks dari label baris dan pasangan teks ternormalisasinya"""
+        self._teks = dict(zip((int(l) for l in label), teks))
+        self._larik = None
+        self._bangun_utama()
+    
+    def _bangun_utama(self):
+        """Menyusun CSR trigram -> dokumen dari semua teks lalu mengosongkan delta"""
+        label = np.fromiter(self._teks.keys(), dtype=np.int64, count=len(self._teks))
+        dokumen = (label[:, None] * self.KOLOM + np.arange(self.KOLOM)).ravel()
+        posisi, trigram = self._trigram([t for pasangan in self._teks.values() for t in pasangan])
+        # 37^3 id trigram muat di uint16, sehingga argsort stabil memakai radix sort
+        urutan = np.argsort(trigram.astype(np.uint16), kind='stable')
+        self._dokumen = dokumen[posisi[urutan]]
+        self._indptr = np.zeros(self.ABJAD ** 3 + 1, dtype=np.int64)
+        np.cumsum(np.bincount(trigram, minlength=self.ABJAD ** 3), out=self._indptr[1:])
+        panjang = int(dokumen.max()) + 1 if len(dokumen) else 0
+        self._jumlah = np.bincount(dokumen[posisi], minlength=panjang)
+        self._kotor = set()
+        self._baru = {}
+    
+    def _mungkin_bangun(self):
+        """Menggabung delta ke indeks utama jika sudah terlalu besar"""
+        if len(self._kotor) > max(self.batas_delta, len(self._teks) // 20):
+            self._bangun_utama()
+    
+    def tambah(self, label, teks):
+        """Mengindeks (ulang) pasangan teks milik satu baris"""
+        label = int(label)
+        self._teks[label] = teks
+        self._larik = None
+        self._kotor.add(label)
+        posisi, trigram = self._trigram(list(teks))
+        self._baru[label] = [set(trigram[posisi == k].tolist()) for k in range(self.KOLOM)]
+        self._mungkin_bangun()
+    
+    def tambah_banyak(self, label, teks):
+        """Mengindeks banyak baris sekaligus (mis. satu batch impor)"""
+        if len(label) <= self.batas_delta:
+            for l, t in zip(label, teks):
+                self.tambah(l, t)
+            return
+        self._teks.update(zip((int(l) for l in label), teks))
+        self._larik = None
+        self._bangun_utama()
+    
+    def hapus(self, label):
+        """Mengeluarkan satu baris dari indeks"""
+        label = int(label)
+        self._teks.pop(label, None)
+        self._larik = None
+        self._baru.pop(label, None)
+        self._kotor.add(label)
+        self._mungkin_bangun()
+    
+    def ukuran_memori(self):
+        """Perkiraan memori indeks (byte): array CSR, teks per label dan delta"""
+        larik = self._indptr.nbytes + self._dokumen.nbytes + self._jumlah.nbytes
+        return larik + _ukuran_dict(self._teks) + _ukuran_dict(self._baru) + sys.getsizeof(self._kotor)
+    
+    def _bonus(self, kueri, label):
+        """Bonus per label: kueri sama persis dengan salah satu kolom, atau cocok kata utuh"""
+        bonus = np.zeros(len(label))
+        for i, l in enumerate(label.tolist()):
+            for t in self._teks[l]:
+                if t == kueri:
+                    bonus[i] = self.BONUS_PERSIS
+                    break
+                if f" {kueri} " in f" {t} ":
+                    bonus[i] = self.BONUS_KATA
+        return bonus
+    
+    def cari(self, kueri, batas=20, kandidat=None, ambang=0.5):
+        """Daftar (label, skor) berperingkat untuk kueri ternormalisasi, dibatasi ``kandidat`` dan ``ambang``"""
+        pendek = len(kueri) < 3
+        if pendek:
+            label, skor = self._cari_pendek(kueri)
+        else:
+            label, skor = self._cari_trigram(kueri, ambang)
+        
+        if kandidat is not None:
+            izin = np.isin(label, kandidat)
+            label, skor = label[izin], skor[izin]
+        if not pendek:
+            if len(label) > batas:
+                # Hanya baris yang masih bisa masuk `batas` teratas setelah bonus yang diperiksa
+                ambang_skor = -np.partition(-skor, batas - 1)[batas - 1]
+                calon = skor >= ambang_skor - self.BONUS_PERSIS
+                label, skor = label[calon], skor[calon]
+            skor = skor + self._bonus(kueri, label)
+        if len(label) > batas:
+            # Semua yang seri dengan skor ke-`batas` ikut, lalu seri diputus oleh label
+            ambang_skor = -np.partition(-skor, batas - 1)[batas - 1]
+            teratas = skor >= ambang_skor
+            label, skor = label[teratas], skor[teratas]
+        urutan = np.lexsort((label, -skor))[:batas]
+        return list(zip(label[urutan].tolist(), skor[urutan].tolist()))
+    
+    def _cari_pendek(self, kueri):
+        """(label, skor) untuk kueri 1-2 karakter: awalan kata Nama atau potongan Telepon"""
+        if not kueri:
+            return np.array([], dtype=np.int64), np.array([])
+        if self._larik is None:
+            # Larik Nama (diapit spasi) dan Telepon dibangun ulang hanya setelah ada mutasi
+            label = np.fromiter(self._teks.keys(), dtype=np.int64, count=len(self._teks))
+            nama = np.array([f" {n} " for n, _ in self._teks.values()], dtype=str)
+            telepon = np.array([t for _, t in self._teks.values()], dtype=str)
+            self._larik = (label, nama, telepon)
+        label, nama, telepon = self._larik
+        
+        awal_kata = np.char.find(nama, f" {kueri}") >= 0
+        di_telepon = np.char.find(telepon, kueri) >= 0
+        skor = np.select(
+            [np.char.startswith(nama, f" {kueri}"), awal_kata,
+             np.char.startswith(telepon, kueri), di_telepon],
+            [1.0, 0.9, 0.9, 0.8], 0.0)
+        bonus = np.where(nama == f" {kueri} ", self.BONUS_PERSIS,
+                         np.where(np.char.find(nama, f" {kueri} ") >= 0, self.BONUS_KATA, 0.0))
+        skor = skor + np.where(awal_kata, bonus, 0.0)
+        cocok = awal_kata | di_telepon
+        return label[cocok], skor[cocok]
+    
+    def _cari_trigram(self, kueri, ambang):
+        """(label, skor) dari indeks trigram beserta delta"""
+        trigram_kueri = np.unique(self._trigram([kueri], pengapit_kanan=False)[1])
+        if len(trigram_kueri) == 0:
+            return np.array([], dtype=np.int64), np.array([])
+        
+        potongan = [self._dokumen[self._indptr[t]:self._indptr[t + 1]] for t in trigram_kueri]
+        sama = np.bincount(np.concatenate(potongan), minlength=len(self._jumlah))
+        cakupan = sama / len(trigram_kueri)
+        jaccard = sama / (len(trigram_kueri) + self._jumlah - sama).clip(min=1)
+        skor_dokumen = np.where(cakupan >= ambang, cakupan + 0.1 * jaccard, 0)
+        skor = skor_dokumen.reshape(-1, self.KOLOM).max(axis=1)
+        
+        lolos = skor > 0
+        if self._kotor:
+            kotor = np.fromiter(self._kotor, dtype=np.int64, count=len(self._kotor))
+            lolos[kotor[kotor < len(lolos)]] = False
+        label = np.flatnonzero(lolos)
+        skor = skor[label]
+        
+        # Baris di delta dinilai langsung dari set trigram per kolomnya
+        himpunan = set(trigram_kueri.tolist())
+        tambahan = []
+        for l, per_kolom in self._baru.items():
+            terbaik = 0
+            for trigram in per_kolom:
+                s = len(himpunan & trigram)
+                if s / len(himpunan) >= ambang:
+                    terbaik = max(terbaik, s / len(himpunan)
+                                  + 0.1 * s / (len(himpunan) + len(trigram) - s))
+            if terbaik:
+                tambahan.append((l, terbaik))
+        if tambahan:
+            label = np.concatenate([label, np.array([l for l, _ in tambahan], dtype=np.int64)])
+            skor = np.concatenate([skor, np.array([s for _, s in tambahan])])
+        return label, skor
 
 class OrganisasiManager(DataManager):
     """Kelas turunan untuk mengelola data organisasi masjid"""
-    def __init__(self, filename="data_organisasi.csv"):
-        super().__init__(filename)
+    def __init__(self, filename="data_organisasi.csv", penyimpanan=None):
+        if penyimpanan is None:
+            penyimpanan = buat_penyimpanan(filename, kolom=KOLOM_ORGANISASI,
+                                           indeks=('Divisi', 'Jabatan'))
+        riwayat = RiwayatPerubahan(filename, dtype_baca=_dtype_teks(KOLOM_ORGANISASI))
+        super().__init__(filename, penyimpanan=penyimpanan, skema=SKEMA_ORGANISASI,
+                         riwayat=riwayat)
+        self._indeks_id = {}
+        self._nama_id = {}
+        self._label_berikut = 0
+        self.agregat = AgregatOrganisasi()
+        self.indeks_bitmap = IndeksBitmap(('Divisi', 'Jabatan'))
+        self.indeks_teks = IndeksTeks()
+        self._memo_filter = CacheLRU(16)
+        self._memo_riwayat = CacheLRU(8)
         self.load_data()
     
-    def tambah_anggota(self, nama, jabatan, divisi, gaji, telepon):
-        """Menambahkan anggota baru"""
-        # Generate ID otomatis
+    def load_data(self):
+        """Memuat data lalu membangun ulang indeks ID"""
+        with self._lock:
+            super().load_data()
+            self._bangun_indeks()
+    
+    def _bangun_indeks(self):
+        """Membangun indeks ID -> label baris, ID -> nama, bitmap, teks dan agregat dari data"""
+        self.agregat = AgregatOrganisasi.dari_data(self.data)
+        self.indeks_bitmap.bangun(self.data)
         if self.data.empty:
-            new_id = 1
-        else:
-            new_id = self.data['ID'].max() + 1
-            
-        new_data = {
-            'ID': new_id,
-            'Nama': nama,
-            'Jabatan': jabatan,
-            'Divisi': divisi,
-            'Gaji': gaji,
-            'Telepon': telepon,
-            'Tanggal_Bergabung': datetime.now().strftime("%Y-%m-%d")
-        }
+            self.indeks_teks.bangun([], [])
+            self._indeks_id = {}
+            self._nama_id = {}
+            self._label_berikut = 0
+            return
+        ids = self.data['ID'].tolist()
+        self._indeks_id = dict(zip(ids, self.data.index))
+        self._nama_id = dict(zip(ids, self.data['Nama'].tolist()))
+        self._label_berikut = int(self.data.index.max()) + 1
+        self.indeks_teks.bangun(self.data.index,
+                                IndeksTeks.teks(self.data['Nama'], self.data['Telepon']))
+    
+    @staticmethod
+    def _teks_anggota(nama, telepon):
+        """Pasangan teks (nama, telepon) ternormalisasi satu anggota untuk IndeksTeks"""
+        return IndeksTeks.teks(pd.Series([nama], dtype=object), pd.Series([telepon], dtype=object))[0]
+    
+    def ukuran_memori(self):
+        """Perkiraan memori data beserta indeks ID, bitmap, indeks teks dan memo filter (byte)"""
+        memo = sum(int(hasil['data'].memory_usage().sum())
+                   for hasil in self._memo_filter.nilai())
+        return (super().ukuran_memori() + _ukuran_dict(self._indeks_id) + _ukuran_dict(self._nama_id)
+                + self.indeks_bitmap.ukuran_memori() + self.indeks_teks.ukuran_memori() + memo)
+    
+    def get_anggota(self, id_anggota):
+        """Mengembalikan baris anggota (Series) berdasarkan ID, atau None"""
+        label = self._indeks_id.get(id_anggota)
+        if label is None:
+            return None
+        return self.data.loc[label]
+    
+    def nama_anggota(self, id_anggota):
+        """Mengembalikan nama anggota berdasarkan ID, atau None"""
+        return self._nama_id.get(id_anggota)
+    
+    def statistik(self):
+        """Total anggota, total/rata-rata gaji dan jumlah divisi"""
+        return self.agregat.statistik()
+    
+    def ringkasan_divisi(self):
+        """Total gaji dan jumlah anggota per Divisi"""
+        return self.agregat.ringkasan(self.agregat.per_divisi, 'Divisi')
+    
+    def ringkasan_jabatan(self):
+        """Total gaji dan jumlah anggota per Jabatan"""
+        return self.agregat.ringkasan(self.agregat.per_jabatan, 'Jabatan')
+    
+    def filter_laporan(self, divisi, jabatan):
+        """Data dan metrik untuk filter Divisi x Jabatan, di-memo per filter dan versi data
         
-        if self.data.empty:
-            self.data = pd.DataFrame([new_data])
-        else:
-            self.data = pd.concat([self.data, pd.DataFrame([new_data])], ignore_index=True)
+        Baris dipilih lewat indeks bitmap, metrik diambil dari agregat berjalan.
+        """
+        kunci = (tuple(sorted(divisi)), tuple(sorted(jabatan)), self.versi)
         
-        self.save_data()
-        return True
+        def hitung():
+            bitmap = self.indeks_bitmap.pilih({'Divisi': divisi, 'Jabatan': jabatan})
+            hasil = self.agregat.statistik_filter(divisi, jabatan)
+            hasil['data'] = self.data.loc[IndeksBitmap.ke_label(bitmap)]
+            return hasil
+        
+        with self._lock:
+            return self._memo_filter.ambil(kunci, hitung)
     
-    def edit_anggota(self, id_anggota, nama, jabatan, divisi, gaji, telepon):
-        """Mengedit data anggota"""
-        if not self.data.empty and id_anggota in self.data['ID'].values:
-            idx = self.data[self.data['ID'] == id_anggota].index[0]
-            self.data.at[idx, 'Nama'] = nama
-            self.data.at[idx, 'Jabatan'] = jabatan
-            self.data.at[idx, 'Divisi'] = divisi
-            self.data.at[idx, 'Gaji'] = gaji
-            self.data.at[idx, 'Telepon'] = telepon
-            self.save_data()
-            return True
-        return False
+    def cari_anggota(self, kueri, batas=20, filter=None):
+        """Anggota yang cocok dengan kueri Nama/Telepon (toleran salah ketik), berperingkat
+        
+        ``filter`` {kolom: [nilai, ...]} untuk Divisi/Jabatan diselesaikan lewat
+        indeks bitmap sebelum peringkat. Hasil berisi kolom tambahan ``Skor``.
+        """
+        with self._lock:
+            kandidat = None
+            if filter:
+                kandidat = IndeksBitmap.ke_label(self.indeks_bitmap.pilih(filter))
+            hasil = self.indeks_teks.cari(IndeksTeks.kueri(kueri), batas=batas, kandidat=kandidat)
+            return self.data.loc[[label for label, _ in hasil]].assign(
+                Skor=[skor for _, skor in hasil])
+    
+    def cek_konsistensi_agregat(self):
+        """Membandingkan agregat berjalan dengan perhitungan ulang penuh"""
+        return self.agregat.sama_dengan(AgregatOrganisasi.dari_data(self.data))
+    
+    def data_pada(self, tanggal):
+        """Roster pada akhir ``tanggal`` direkonstruksi dari riwayat, atau None sebelum riwayat dimulai
+        
+        Di-memo per tanggal dan versi data; tanggal hari ini atau sesudahnya
+        langsung memakai data di memori tanpa membaca disk.
+        """
+        tanggal = pd.Timestamp(tanggal).normalize()
+        if tanggal >= pd.Timestamp(datetime.now().date()):
+            return self.data
+        
+        def hitung():
+            data = self.riwayat.keadaan_pada(tanggal + pd.Timedelta(days=1))
+            return None if data is None else self.terapkan_skema(data)
+        
+        with self._lock:
+            return self._memo_riwayat.ambil(('data', tanggal, self.versi), hitung)
+    
+    def agregat_pada(self, tanggal):
+        """Agregat (``AgregatOrganisasi``) pada akhir ``tanggal``, atau None sebelum riwayat dimulai
+        
+        Tanggal hari ini atau sesudahnya memakai agregat berjalan; tanggal
+        lampau di-memo per tanggal dan versi data.
+        """
+        tanggal = pd.Timestamp(tanggal).normalize()
+        if tanggal >= pd.Timestamp(datetime.now().date()):
+            return self.agregat
+        
+        def hitung():
+            data = self.data_pada(tanggal)
+            return None if data is None else AgregatOrganisasi.dari_data(data)
+        
+        with self._lock:
+            return self._memo_riwayat.ambil(('agregat', tanggal, self.versi), hitung)
+    
+    def anggaran_per_periode(self, daftar_tanggal):
+        """Total gaji per Divisi pada akhir setiap tanggal dari satu sapuan riwayat, di-memo per versi"""
+        batas = sorted({pd.Timestamp(t).normalize() + pd.Timedelta(days=1) for t in daftar_tanggal})
+        kunci = (tuple(batas), self.versi)
+        
+        def hitung():
+            daftar = self.riwayat.daftar_cekpoin()
+            if not daftar:
+                return pd.DataFrame()
+            batas_iso = [_waktu_iso(b) for b in batas]
+            # Cekpoin terakhir sebelum tanggal pertama (atau cekpoin pertama),
+            # lalu semua cekpoin berikutnya sebelum tanggal terakhir
+            mulai = max(sum(1 for c in daftar if c["waktu"] < batas_iso[0]) - 1, 0)
+            segmen = [c for j, c in enumerate(daftar)
+                      if j == mulai or (j > mulai and c["waktu"] < batas_iso[-1])]
+            
+            agregat = None
+            anggota = {}
+            
+            def muat(cekpoin):
+                nonlocal agregat, anggota
+                data = self.terapkan_skema(self.riwayat.muat_cekpoin(cekpoin))
+                agregat = AgregatOrganisasi.dari_data(data)
+                anggota = {}
+                if not data.empty:
+                    kolom = (data[k].tolist() for k in ('ID', 'Divisi', 'Jabatan', 'Gaji'))
+                    anggota = {id_: [divisi, jabatan, gaji]
+                               for id_, divisi, jabatan, gaji in zip(*kolom)}
+            
+            hasil = {}
+            # Batas yang jatuh sebelum cekpoin awal tidak punya riwayat
+            i = sum(1 for b in batas_iso if b <= segmen[0]["waktu"])
+            
+            def rekam(sampai):
+                nonlocal i
+                while i < len(batas) and (sampai is None or sampai >= batas_iso[i]):
+                    hasil[batas[i]] = {d: total for d, (total, _) in agregat.per_divisi.items()}
+                    i += 1
+            
+            for nomor, cekpoin in enumerate(segmen):
+                if nomor > 0:
+                    rekam(cekpoin["waktu"])
+                muat(cekpoin)
+                akhir = segmen[nomor + 1]["offset"] if nomor + 1 < len(segmen) else None
+                for entri in self.riwayat.perubahan(cekpoin["offset"], batas[-1], akhir):
+                    rekam(entri["waktu"])
+                    record = entri["data"]
+                    lama = anggota.get(record['ID'])
+                    if entri["op"] == "hapus":
+                        if lama is not None:
+                            agregat.kurangi(*lama)
+                            del anggota[record['ID']]
+                        continue
+                    if entri["op"] == "edit" and lama is None:
+                        continue
+                    baru = list(lama) if entri["op"] == "edit" else [None, None, 0]
+                    for posisi, nama in enumerate(('Divisi', 'Jabatan', 'Gaji')):
+                        if nama in record:
+                            baru[posisi] = record[nama]
+                    if lama is not None:
+                        agregat.kurangi(*lama)
+                    agregat.tambah(*baru)
+                    anggota[record['ID']] = baru
+            rekam(None)
+            
+            tabel = pd.DataFrame.from_dict(hasil, orient='index').fillna(0)
+            tabel = tabel.reindex(index=batas, columns=sorted(tabel.columns))
+            tabel.index = tabel.index - pd.Timedelta(days=1)
+            tabel.index.name = 'Tanggal'
+            return tabel
+        
+        with self._lock:
+            return self._memo_riwayat.ambil(kunci, hitung)
     
-    def hapus_anggota(self, id_anggota):
-        """Menghapus data anggota"""
-        if not self.data.empty and id_anggota in self.data['ID'].values:
-            self.data = self.data[self.data['ID'] != id_anggota]
-            self.save_data()
+    @ukur_waktu
+    def tambah_anggota(self, nama, jabatan, divisi, gaji, telepon):
+        """Menambahkan anggota baru"""
+        with self.transaksi():
+            # Generate ID otomatis (naik monoton, aman lintas proses)
+            new_id = self.alokasi_id()
+            
+            new_data = {
+                'ID': new_id,
+                'Nama': nama,
+                'Jabatan': jabatan,
+                'Divisi': divisi,
+                'Gaji': gaji,
+                'Telepon': telepon,
+                'Tanggal_Bergabung': datetime.now().strftime("%Y-%m-%d")
+            }
+            
+            # Label baris baru tidak pernah dipakai ulang agar indeks ID tetap valid
+            label = self._label_berikut
+            baris_baru = self.terapkan_skema(pd.DataFrame([new_data], index=[label]))
+            if self.data.empty:
+                self.data = baris_baru
+            else:
+                self.data = pd.concat([self.data, baris_baru])
+            self._indeks_id[new_id] = label
+            self._nama_id[new_id] = nama
+            self._label_berikut = label + 1
+            self.agregat.tambah(divisi, jabatan, gaji)
+            self.indeks_bitmap.tambah(label, {'Divisi': divisi, 'Jabatan': jabatan})
+            self.indeks_teks.tambah(label, self._teks_anggota(nama, telepon))
+            
+            self.catat_perubahan("tambah", new_data)
             return True
-        return False
+    
+    def validasi_batch(self, batch):
+        """Memisahkan baris impor yang sah dan yang ditolak (beserta alasannya)
+        
+        Validasi dikerjakan per kolom (vektor), bukan per baris.
+        """
+        batch = batch.copy()
+        for kolom in ('Nama', 'Jabatan', 'Divisi', 'Gaji', 'Telepon'):
+            if kolom not in batch.columns:
+                batch[kolom] = None
+        
+        batch['Nama'] = batch['Nama'].fillna('').astype(str).str.strip()
+        batch['Telepon'] = batch['Telepon'].fillna('').astype(str).str.strip()
+        gaji = pd.to_numeric(batch['Gaji'], errors='coerce')
+        
+        alasan = pd.Series('', index=batch.index)
+        alasan = alasan.mask(batch['Nama'] == '', alasan + 'Nama kosong; ')
+        alasan = alasan.mask(~batch['Jabatan'].isin(DAFTAR_JABATAN), alasan + 'Jabatan tidak dikenal; ')
+        alasan = alasan.mask(~batch['Divisi'].isin(DAFTAR_DIVISI), alasan + 'Divisi tidak dikenal; ')
+        gaji_salah = ~np.isfinite(gaji) | (gaji < 0) | (gaji > GAJI_MAKS) | (gaji % 1 != 0)
+        alasan = alasan.mask(gaji_salah, alasan + 'Gaji tidak valid; ')
+        
+        sah = alasan == ''
+        diterima = batch.loc[sah, ['Nama', 'Jabatan', 'Divisi', 'Telepon']]
+        diterima['Gaji'] = gaji[sah].astype('int64')
+        ditolak = batch.loc[~sah].assign(Alasan=alasan[~sah].str.rstrip('; '))
+        return diterima, ditolak
+    
+    @ukur_waktu
+    def tambah_anggota_batch(self, batch):
+        """Menambahkan banyak anggota sekaligus dari DataFrame; mengembalikan jumlah, baris ditolak dan durasi"""
+        mulai = time.perf_counter()
+        diterima, ditolak = self.validasi_batch(batch)
+        
+        with self.transaksi():
+            jumlah = len(diterima)
+            if jumlah:
+                id_awal = self.alokasi_id(jumlah)
+                label_awal = self._label_berikut
+                baru = pd.DataFrame({
+                    'ID': range(id_awal, id_awal + jumlah),
+                    'Nama': diterima['Nama'].values,
+                    'Jabatan': diterima['Jabatan'].values,
+                    'Divisi': diterima['Divisi'].values,
+                    'Gaji': diterima['Gaji'].values,
+                    'Telepon': diterima['Telepon'].values,
+                    'Tanggal_Bergabung': datetime.now().strftime("%Y-%m-%d")
+                }, index=range(label_awal, label_awal + jumlah))
+                baru = self.terapkan_skema(baru)
+                
+                self.data = baru if self.data.empty else pd.concat([self.data, baru])
+                ids = baru['ID'].tolist()
+                self._indeks_id.update(zip(ids, baru.index))
+                self._nama_id.update(zip(ids, baru['Nama'].tolist()))
+                self._label_berikut = label_awal + jumlah
+                self.agregat.gabung(AgregatOrganisasi.dari_data(baru))
+                for kolom in self.indeks_bitmap.kolom:
+                    for nilai, label in baru.groupby(kolom, observed=True).groups.items():
+                        self.indeks_bitmap.gabung(kolom, nilai, label)
+                self.indeks_teks.tambah_banyak(baru.index, IndeksTeks.teks(baru['Nama'], baru['Telepon']))
+                
+                self.catat_perubahan_banyak("tambah", baru.to_dict('records'))
+        
+        durasi = time.perf_counter() - mulai
+        return {
+            'ditambah': jumlah,
+            'ditolak': ditolak,
+            'detik': durasi,
+            'baris_per_detik': jumlah / durasi if durasi > 0 else 0
+        }
+    
+    @ukur_waktu
+    def edit_anggota(self, id_anggota, nama, jabatan, divisi, gaji, telepon, versi_diharapkan=None):
+        """Mengedit data anggota
+        
+        ``versi_diharapkan`` (``versi_disk`` saat form ditampilkan) membuat
+        edit gagal dengan ``KonflikVersi`` jika data sudah diubah sesudahnya.
+        """
+        with self.transaksi(versi_diharapkan):
+            idx = self._indeks_id.get(id_anggota)
+            if idx is not None:
+                lama = self.data.loc[idx]
+                self.agregat.kurangi(lama['Divisi'], lama['Jabatan'], lama['Gaji'])
+                self.agregat.tambah(divisi, jabatan, gaji)
+                self.indeks_bitmap.hapus(idx, lama)
+                self.indeks_bitmap.tambah(idx, {'Divisi': divisi, 'Jabatan': jabatan})
+                atur_sel(self.data, idx, 'Nama', nama)
+                atur_sel(self.data, idx, 'Jabatan', jabatan)
+                atur_sel(self.data, idx, 'Divisi', divisi)
+                atur_sel(self.data, idx, 'Gaji', gaji)
+                atur_sel(self.data, idx, 'Telepon', telepon)
+                self._nama_id[id_anggota] = nama
+                self.indeks_teks.tambah(idx, self._teks_anggota(nama, telepon))
+                self.catat_perubahan("edit", {
+                    'ID': id_anggota,
+                    'Nama': nama,
+                    'Jabatan': jabatan,
+                    'Divisi': divisi,
+                    'Gaji': gaji,
+                    'Telepon': telepon
+                }, lama=lama.to_dict())
+                return True
+            return False
+    
+    @ukur_waktu
+    def hapus_anggota(self, id_anggota, versi_diharapkan=None):
+        """Menghapus data anggota (lihat ``edit_anggota`` untuk ``versi_diharapkan``)"""
+        with self.transaksi(versi_diharapkan):
+            idx = self._indeks_id.pop(id_anggota, None)
+            if idx is not None:
+                lama = self.data.loc[idx]
+                self.agregat.kurangi(lama['Divisi'], lama['Jabatan'], lama['Gaji'])
+                self.indeks_bitmap.hapus(idx, lama)
+                self.data = self.data.drop(index=idx)
+                del self._nama_id[id_anggota]
+                self.indeks_teks.hapus(idx)
+                self.catat_perubahan("hapus", {'ID': id_anggota}, lama=lama.to_dict())
+                return True
+            return False
+
+def _ringkas_tenant(filename):
+    """AgregatOrganisasi satu tenant; dijalankan di proses pekerja laporan gabungan"""
+    penyimpanan = buat_penyimpanan(filename, kolom=KOLOM_ORGANISASI, indeks=('Divisi', 'Jabatan'))
+    # muat() bisa memadatkan jurnal atau memigrasi CSV, jadi dijalankan di bawah kunci tenant
+    with KunciFile(filename + ".lock"):
+        data = penyimpanan.muat()
+    return AgregatOrganisasi.dari_data(data)
+
+class PengelolaTenant:
+    """Pengelola data banyak masjid (tenant), dimuat saat diakses dan dikeluarkan secara LRU"""
+    EKSTENSI = (".db", ".sqlite", ".sqlite3", ".csv")   # urutan prioritas jika nama sama
+    
+    def __init__(self, folder, anggaran_memori=512 * 2**20, bawaan=None):
+        self.folder = folder
+        self.bawaan = dict(bawaan or {})
+        self.manajer = CacheLRU(kapasitas=None, ukuran=lambda m: m.ukuran_memori(),
+                                anggaran=anggaran_memori)
+        self._memo_laporan = CacheLRU(4)
+    
+    def daftar_tenant(self):
+        """{nama tenant: path file}, tenant bawaan lebih dulu lalu urut nama"""
+        ditemukan = {}
+        if os.path.isdir(self.folder):
+            for nama_file in os.listdir(self.folder):
+                # File tersembunyi termasuk file sementara tulis_atomik (.tmp-*)
+                if nama_file.startswith("."):
+                    continue
+                nama, ekstensi = os.path.splitext(nama_file)
+                path = os.path.join(self.folder, nama_file)
+                if ekstensi.lower() in self.EKSTENSI and os.path.isfile(path):
+                    # Tenant yang dimigrasi ke SQLite memakai .db, bukan CSV sumbernya
+                    prioritas = self.EKSTENSI.index(ekstensi.lower())
+                    if nama not in ditemukan or prioritas < ditemukan[nama][0]:
+                        ditemukan[nama] = (prioritas, path)
+        tenant = dict(self.bawaan)
+        for nama in sorted(ditemukan):
+            tenant.setdefault(nama, ditemukan[nama][1])
+        return tenant
+    
+    def pilih(self, nama):
+        """Nama tenant jika ada, selain itu tenant pertama"""
+        tenant = self.daftar_tenant()
+        if nama in tenant:
+            return nama
+        return next(iter(tenant), None)
+    
+    def get(self, nama):
+        """OrganisasiManager milik tenant, dimuat saat pertama diakses"""
+        path = self.daftar_tenant()[nama]
+        # Dimuat di luar kunci agar sesi tenant lain tidak tertahan; cache menyisipkan di bawah kuncinya
+        manajer = self.manajer.ambil(nama, lambda: OrganisasiManager(path))
+        # Data tenant bisa bertambah sejak dimuat, jadi anggaran diperiksa di setiap akses
+        self.manajer.rapikan()
+        return manajer
+    
+    def tambah_tenant(self, nama):
+        """Membuat tenant baru berupa file CSV kosong, mengembalikan nama tenant"""
+        nama = nama.strip()
+        if not nama or not all(c.isalnum() or c in " -_" for c in nama):
+            raise ValueError("Nama masjid hanya boleh berisi huruf, angka, spasi, - dan _")
+        if nama in self.daftar_tenant():
+            raise ValueError(f"Masjid '{nama}' sudah terdaftar")
+        os.makedirs(self.folder, exist_ok=True)
+        kosong = pd.DataFrame(columns=list(KOLOM_ORGANISASI))
+        tulis_atomik(os.path.join(self.folder, nama + ".csv"),
+                     lambda f: kosong.to_csv(f, index=False))
+        return nama
+    
+    @ukur_waktu
+    def laporan_gabungan(self, maks_proses=None):
+        """Ringkasan lintas tenant ('per_masjid', 'per_divisi', 'total'), di-memo per tanda file"""
+        tenant = self.daftar_tenant()
+        kunci = tuple((nama, _tanda_file(path, path + ".meta")) for nama, path in tenant.items())
+        return self._memo_laporan.ambil(kunci, lambda: self._hitung_laporan(tenant, maks_proses))
+    
+    def _hitung_laporan(self, tenant, maks_proses):
+        """Agregat tiap tenant: dari memori jika sudah dimuat, sisanya paralel di proses pekerja"""
+        agregat = {}
+        sisa = []
+        for nama, path in tenant.items():
+            manajer = self.manajer.intip(nama)
+            if manajer is not None:
+                manajer.segarkan()
+                agregat[nama] = manajer.agregat
+            else:
+                sisa.append(nama)
+        
+        if len(sisa) == 1 or maks_proses == 1:
+            agregat.update((nama, _ringkas_tenant(tenant[nama])) for nama in sisa)
+        elif sisa:
+            # Pekerja dirujuk lewat modul yang bisa diimpor: saat dijalankan oleh
+            # Streamlit file ini berstatus __main__ dan fungsinya tidak bisa di-pickle
+            modul = importlib.import_module(os.path.splitext(os.path.basename(__file__))[0])
+            jumlah_proses = min(len(sisa), maks_proses or os.cpu_count() or 1)
+            # spawn, bukan fork: server Streamlit berjalan multi-thread
+            konteks = multiprocessing.get_context("spawn")
+            with ProcessPoolExecutor(max_workers=jumlah_proses, mp_context=konteks) as pool:
+                hasil = pool.map(modul._ringkas_tenant, [tenant[nama] for nama in sisa])
+                agregat.update(zip(sisa, hasil))
+        
+        total = AgregatOrganisasi()
+        baris = []
+        for nama in tenant:
+            total.gabung(agregat[nama])
+            statistik = agregat[nama].statistik()
+            baris.append((nama, statistik['total_anggota'], statistik['total_gaji'],
+                          statistik['rata_rata_gaji']))
+        per_masjid = pd.DataFrame(
+            baris, columns=['Masjid', 'Jumlah Anggota', 'Total Gaji', 'Rata-rata Gaji']
+        ).set_index('Masjid')
+        per_divisi = pd.DataFrame(
+            {nama: {d: t for d, (t, _) in agregat[nama].per_divisi.items()} for nama in tenant}
+        ).T.fillna(0).sort_index(axis=1)
+        per_divisi.index.name = 'Masjid'
+        return {'per_masjid': per_masjid, 'per_divisi': per_divisi, 'total': total}
 
 class VisualisasiManager:
-    """Kelas untuk mengelola visualisasi data"""
-    def grafik_gaji_divisi(self, data):
-        """Membuat grafik gaji per divisi"""
-        if data.empty:
+    """Kelas untuk mengelola visualisasi data
+    
+    plotly baru diimpor saat figure pertama dibangun; figure di-cache per (grafik, versi).
+    """
+    def __init__(self, kapasitas_cache=32):
+        self.cache = CacheLRU(kapasitas_cache)
+    
+    def _dari_cache(self, nama, versi, buat):
+        """Mengambil figure dari cache, atau membangunnya jika versi belum ada"""
+        if versi is None:
+            return buat()
+        return self.cache.ambil((nama, versi), buat)
+    
+    def grafik_gaji_divisi(self, ringkasan_divisi, versi=None):
+        """Membuat grafik gaji per divisi dari ringkasan (Total per Divisi)"""
+        if ringkasan_divisi.empty:
             return None
+        return self._dari_cache("gaji_divisi", versi,
+                                lambda: self._buat_grafik_gaji_divisi(ringkasan_divisi))
+    
+    @ukur_waktu
+    def _buat_grafik_gaji_divisi(self, ringkasan_divisi):
+        """Membangun figure pie anggaran per divisi"""
+        import plotly.express as px
         
-        fig = px.pie(data, values='Gaji', names='Divisi', 
+        fig = px.pie(values=ringkasan_divisi['Total'], names=ringkasan_divisi.index, 
                      title='Distribusi Anggaran per Divisi',
                      color_discrete_sequence=px.colors.qualitative.Set3)
         fig.update_traces(textposition='inside', textinfo='percent+label')
         return fig
     
-    def grafik_struktur_organisasi(self, data):
-        """Membuat grafik struktur organisasi"""
-        if data.empty:
+    def grafik_struktur_organisasi(self, ringkasan_jabatan, versi=None):
+        """Membuat grafik struktur organisasi dari ringkasan (Jumlah per Jabatan)"""
+        if ringkasan_jabatan.empty:
             return None
+        return self._dari_cache("struktur_organisasi", versi,
+                                lambda: self._buat_grafik_struktur_organisasi(ringkasan_jabatan))
+    
+    @ukur_waktu
+    def _buat_grafik_struktur_organisasi(self, ringkasan_jabatan):
+        """Membangun figure batang jumlah anggota per jabatan"""
+        import plotly.express as px
         
-        jabatan_count = data['Jabatan'].value_counts()
+        jabatan_count = ringkasan_jabatan['Jumlah'].sort_values(ascending=False)
         fig = px.bar(x=jabatan_count.index, y=jabatan_count.values,
                      title='Jumlah Anggota per Jabatan',
                      labels={'x': 'Jabatan', 'y': 'Jumlah'},
                      color=jabatan_count.values,
                      color_continuous_scale='Viridis')
         return fig
+    
+    def grafik_anggaran_waktu(self, anggaran_periode, versi=None):
+        """Membuat grafik garis total gaji per divisi dari tabel anggaran per periode"""
+        if anggaran_periode.empty:
+            return None
+        return self._dari_cache("anggaran_waktu", versi,
+                                lambda: self._buat_grafik_anggaran_waktu(anggaran_periode))
+    
+    @ukur_waktu
+    def _buat_grafik_anggaran_waktu(self, anggaran_periode):
+        """Membangun figure garis anggaran per divisi dari waktu ke waktu"""
+        import plotly.express as px
+        
+        fig = px.line(anggaran_periode, x=anggaran_periode.index, y=list(anggaran_periode.columns),
+                      title='Anggaran per Divisi dari Waktu ke Waktu',
+                      labels={'value': 'Total Gaji', 'variable': 'Divisi'},
+                      markers=True)
+        return fig
+
+class EksporManager:
+    """Kelas untuk ekspor data ke CSV, Excel dan Parquet, ditulis per potongan dan di-cache LRU"""
+    FORMAT = {
+        'csv': ('.csv', 'text/csv'),
+        'excel': ('.xlsx', 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'),
+        'parquet': ('.parquet', 'application/vnd.apache.parquet')
+    }
+    
+    def __init__(self, folder=None, kapasitas_cache=16, ukuran_potongan=10000):
+        self.folder = folder or tempfile.mkdtemp(prefix="ashobirin-ekspor-")
+        self.ukuran_potongan = ukuran_potongan
+        self.cache = CacheLRU(kapasitas_cache, saat_dibuang=self._hapus_file)
+    
+    def potongan(self, data):
+        """Generator potongan DataFrame berukuran ukuran_potongan baris"""
+        for mulai in range(0, len(data), self.ukuran_potongan):
+            yield data.iloc[mulai:mulai + self.ukuran_potongan]
+    
+    def iter_csv(self, data):
+        """Generator CSV dalam bentuk bytes, satu potongan per yield"""
+        yield data.iloc[:0].to_csv(index=False).encode("utf-8")
+        for bagian in self.potongan(data):
+            yield bagian.to_csv(index=False, header=False).encode("utf-8")
+    
+    def tulis_csv(self, data, path):
+        """Menulis CSV per potongan"""
+        with open(path, "wb") as f:
+            for blok in self.iter_csv(data):
+                f.write(blok)
+    
+    def tulis_excel(self, data, path):
+        """Menulis Excel baris demi baris dengan mode constant_memory xlsxwriter"""
+        import xlsxwriter
+        
+        workbook = xlsxwriter.Workbook(path, {'constant_memory': True,
+                                              'default_date_format': 'yyyy-mm-dd'})
+        sheet = workbook.add_worksheet('Organisasi')
+        sheet.write_row(0, 0, list(data.columns))
+        nomor_baris = 1
+        for bagian in self.potongan(data):
+            kolom = [bagian[k].tolist() for k in bagian.columns]
+            for baris in zip(*kolom):
+                sheet.write_row(nomor_baris, 0, [None if pd.isna(v) else v for v in baris])
+                nomor_baris += 1
+        workbook.close()
+    
+    def tulis_parquet(self, data, path):
+        """Menulis Parquet dengan satu row group per potongan"""
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        
+        # Kolom object (mis. Telepon campuran angka/teks) disimpan sebagai string
+        teks = {k: "string" for k in data.columns if data[k].dtype == object}
+        schema = pa.Schema.from_pandas(data.iloc[:0].astype(teks), preserve_index=False)
+        with pq.ParquetWriter(path, schema) as writer:
+            for bagian in self.potongan(data):
+                tabel = pa.Table.from_pandas(bagian.astype(teks), schema=schema, preserve_index=False)
+                writer.write_table(tabel)
+    
+    def ekspor(self, data, format, kunci):
+        """Path file ekspor untuk (format, kunci); dibuat sekali lalu diambil dari cache"""
+        def buat():
+            ekstensi, _ = self.FORMAT[format]
+            fd, path = tempfile.mkstemp(dir=self.folder, suffix=ekstensi)
+            os.close(fd)
+            getattr(self, f"tulis_{format}")(data, path)
+            return path
+        return self.cache.ambil((format, kunci), buat)
+    
+    def buka(self, data, format, kunci):
+        """Isi file ekspor (bytes) untuk st.download_button"""
+        with open(self.ekspor(data, format, kunci), "rb") as f:
+            return f.read()
+    
+    def _hapus_file(self, kunci, path):
+        """Menghapus file ekspor yang dikeluarkan dari cache"""
+        if os.path.exists(path):
+            os.remove(path)
+
+# File data: .csv (berjurnal) atau .db/.sqlite (SQLite, migrasi otomatis dari CSV)
+FILE_DATA = os.environ.get("ASHOBIRIN_DATA", "data_organisasi.csv")
+
+# Masjid lain (tenant): satu file .csv/.db per masjid di folder ini
+FOLDER_MASJID = os.environ.get("ASHOBIRIN_FOLDER_MASJID", "data_masjid")
+ANGGARAN_MEMORI_MB = float(os.environ.get("ASHOBIRIN_ANGGARAN_MEMORI_MB", "512"))
+
+@st.cache_resource
+def get_org_manager(filename=FILE_DATA):
+    """OrganisasiManager bersama untuk semua rerun dan sesi Streamlit"""
+    return OrganisasiManager(filename)
+
+@st.cache_resource
+def get_pengelola_tenant():
+    """PengelolaTenant bersama; data lama menjadi tenant bawaan 'Ashobirin'"""
+    return PengelolaTenant(FOLDER_MASJID, anggaran_memori=int(ANGGARAN_MEMORI_MB * 2**20),
+                           bawaan={"Ashobirin": FILE_DATA})
+
+@st.cache_resource
+def get_viz_manager():
+    """VisualisasiManager bersama agar cache figure bertahan lintas rerun dan sesi"""
+    return VisualisasiManager()
+
+@st.cache_resource
+def get_ekspor_manager():
+    """EksporManager bersama agar file ekspor di-cache lintas rerun dan sesi"""
+    return EksporManager()
 
 # ===============================
 # APLIKASI UTAMA
 # ===============================
 
 class AplikasiMasjidAshobirin:
-    def __init__(self):
-        self.org_manager = OrganisasiManager()
-        self.viz_manager = VisualisasiManager()
+    def __init__(self, filename=None):
+        if filename is None:
+            # Masjid yang dipilih di sidebar pada rerun sebelumnya
+            self.pengelola_tenant = get_pengelola_tenant()
+            self.tenant = self.pengelola_tenant.pilih(st.session_state.get("tenant"))
+            self.org_manager = self.pengelola_tenant.get(self.tenant)
+        else:
+            self.pengelola_tenant = None
+            self.tenant = None
+            self.org_manager = get_org_manager(filename)
+        # Muat ulang hanya jika file diubah dari luar proses ini
+        self.org_manager.segarkan()
+        self.viz_manager = get_viz_manager()
+        self.ekspor_manager = get_ekspor_manager()
         self.setup_page()
     
     def setup_page(self):
@@ -163,10 +2310,14 @@ class AplikasiMasjidAshobirin:
             st.image("C:/Users/Rizky asifau/OneDrive/Pictures/images.jpg", 
                     use_container_width=True)
             
+            if self.pengelola_tenant is not None:
+                self.pilih_tenant()
+            
             selected = option_menu(
                 menu_title="Menu Navigasi",
-                options=["🏠 Beranda", "👥 Struktur Organisasi", "💰 Anggaran", "📊 Data & Laporan", "⚙️ Kelola Data"],
-                icons=["house", "people", "cash-coin", "bar-chart", "gear"],
+                options=["🏠 Beranda", "👥 Struktur Organisasi", "💰 Anggaran", "📊 Data & Laporan", "⚙️ Kelola Data",
+                         "🌐 Semua Masjid", "⏱️ Kinerja"],
+                icons=["house", "people", "cash-coin", "bar-chart", "gear", "globe", "speedometer2"],
                 menu_icon="menu-app",
                 default_index=0,
                 styles={
@@ -178,6 +2329,38 @@ class AplikasiMasjidAshobirin:
             )
         return selected
     
+    def pilih_tenant(self):
+        """Pemilih masjid (tenant) dan formulir menambah masjid baru"""
+        if st.session_state.get("tenant") != self.tenant:
+            st.session_state["tenant"] = self.tenant
+        st.selectbox("🕌 Masjid", list(self.pengelola_tenant.daftar_tenant()), key="tenant",
+                     on_change=self._ganti_tenant)
+        
+        with st.expander("➕ Tambah Masjid"):
+            st.text_input("Nama masjid", key="tenant_baru")
+            st.button("Tambah", key="tombol_tenant_baru", on_click=self._tambah_tenant)
+            pesan = st.session_state.pop("tenant_galat", None)
+            if pesan:
+                st.error(pesan)
+    
+    def _ganti_tenant(self):
+        """Callback pergantian masjid: state filter/halaman milik masjid sebelumnya dibuang"""
+        for kunci in list(st.session_state):
+            if kunci not in ("tenant", "tenant_baru"):
+                del st.session_state[kunci]
+    
+    def _tambah_tenant(self):
+        """Callback tombol tambah masjid: membuat tenant lalu langsung memilihnya"""
+        try:
+            nama = self.pengelola_tenant.tambah_tenant(st.session_state.get("tenant_baru", ""))
+        except ValueError as e:
+            st.session_state["tenant_galat"] = str(e)
+            return
+        self._ganti_tenant()
+        st.session_state["tenant"] = nama
+        st.session_state["tenant_baru"] = ""
+    
+    @ukur_waktu
     def halaman_beranda(self):
         """Menampilkan halaman beranda"""
         col1, col2 = st.columns([2, 1])
@@ -204,25 +2387,22 @@ class AplikasiMasjidAshobirin:
         st.markdown("---")
         st.markdown("### 📈 Statistik Cepat")
         
-        data = self.org_manager.get_all_data()
+        statistik = self.org_manager.statistik()
         col1, col2, col3, col4 = st.columns(4)
         
         with col1:
-            total_anggota = len(data) if not data.empty else 0
-            st.metric("Total Anggota", total_anggota)
+            st.metric("Total Anggota", statistik['total_anggota'])
         
         with col2:
-            total_gaji = data['Gaji'].sum() if not data.empty else 0
-            st.metric("Total Anggaran", f"Rp {total_gaji:,.0f}")
+            st.metric("Total Anggaran", f"Rp {statistik['total_gaji']:,.0f}")
         
         with col3:
-            avg_gaji = data['Gaji'].mean() if not data.empty else 0
-            st.metric("Rata-rata Gaji", f"Rp {avg_gaji:,.0f}")
+            st.metric("Rata-rata Gaji", f"Rp {statistik['rata_rata_gaji']:,.0f}")
         
         with col4:
-            divisi_count = data['Divisi'].nunique() if not data.empty else 0
-            st.metric("Jumlah Divisi", divisi_count)
+            st.metric("Jumlah Divisi", statistik['jumlah_divisi'])
     
+    @ukur_waktu
     def halaman_struktur(self):
         """Menampilkan struktur organisasi"""
         st.markdown('<div class="sub-header">👥 Struktur Organisasi Masjid Ashobirin</div>', unsafe_allow_html=True)
@@ -231,27 +2411,137 @@ class AplikasiMasjidAshobirin:
         
         if not data.empty:
             # Tampilkan grafik struktur
-            fig = self.viz_manager.grafik_struktur_organisasi(data)
+            fig = self.viz_manager.grafik_struktur_organisasi(
+                self.org_manager.ringkasan_jabatan(), versi=self.org_manager.versi)
             if fig:
                 st.plotly_chart(fig, use_container_width=True)
             
             # Tampilkan data dalam bentuk cards
             st.markdown("### 📋 Daftar Anggota Organisasi")
-            
-            for _, row in data.iterrows():
-                with st.container():
-                    col1, col2, col3 = st.columns([3, 2, 1])
-                    with col1:
-                        st.markdown(f"**{row['Nama']}**")
-                        st.markdown(f"*{row['Jabatan']} - {row['Divisi']}*")
-                    with col2:
-                        st.markdown(f"📞 {row['Telepon']}")
-                    with col3:
-                        st.markdown(f"💰 Rp {row['Gaji']:,.0f}")
-                    st.markdown("---")
+            self.daftar_kartu_anggota()
         else:
             st.info("📝 Belum ada data organisasi. Silakan tambah data di menu 'Kelola Data'.")
     
+    def daftar_kartu_anggota(self):
+        """Kartu anggota berhalaman: hanya potongan yang terlihat yang dibangun"""
+        kueri = st.text_input("🔍 Cari nama / telepon", key="struktur_cari",
+                              placeholder="mis. ahmad fauzi atau 0812...")
+        col1, col2, col3 = st.columns([2, 2, 1])
+        with col1:
+            divisi_filter = st.multiselect(
+                "Filter Divisi:",
+                options=list(self.org_manager.agregat.per_divisi),
+                key="struktur_divisi"
+            )
+        with col2:
+            jabatan_filter = st.multiselect(
+                "Filter Jabatan:",
+                options=list(self.org_manager.agregat.per_jabatan),
+                key="struktur_jabatan"
+            )
+        with col3:
+            ukuran_halaman = st.selectbox("Per halaman", [10, 25, 50, 100], index=1,
+                                          key="struktur_ukuran")
+        
+        filter = {}
+        if divisi_filter:
+            filter['Divisi'] = divisi_filter
+        if jabatan_filter:
+            filter['Jabatan'] = jabatan_filter
+        
+        if kueri.strip():
+            # Hasil pencarian berperingkat dari indeks trigram, tanpa halaman
+            potongan = self.org_manager.cari_anggota(kueri, batas=ukuran_halaman, filter=filter)
+            if potongan.empty:
+                st.info("Tidak ada anggota yang cocok dengan pencarian.")
+                return
+            st.caption(f"{len(potongan)} anggota paling cocok untuk \"{kueri.strip()}\"")
+            self.kartu_anggota(potongan)
+            return
+        
+        # Jumlah baris yang cocok dihitung dulu agar nomor halaman bisa dibatasi
+        _, total = self.org_manager.halaman(filter, offset=0, batas=0)
+        if total == 0:
+            st.info("Tidak ada anggota yang cocok dengan filter.")
+            return
+        
+        jumlah_halaman = (total - 1) // ukuran_halaman + 1
+        nomor = st.number_input(f"Halaman (dari {jumlah_halaman})", min_value=1,
+                                max_value=jumlah_halaman, value=1, key="struktur_halaman")
+        potongan, _ = self.org_manager.halaman(filter, offset=(nomor - 1) * ukuran_halaman,
+                                               batas=ukuran_halaman)
+        st.caption(f"Menampilkan {len(potongan)} dari {total} anggota")
+        self.kartu_anggota(potongan)
+    
+    def kartu_anggota(self, potongan):
+        """Menampilkan satu kartu per baris anggota"""
+        kolom = ['Nama', 'Jabatan', 'Divisi', 'Telepon', 'Gaji']
+        for nama, jabatan, divisi, telepon, gaji in zip(*(potongan[k].tolist() for k in kolom)):
+            with st.container():
+                col1, col2, col3 = st.columns([3, 2, 1])
+                with col1:
+                    st.markdown(f"**{nama}**")
+                    st.markdown(f"*{jabatan} - {divisi}*")
+                with col2:
+                    st.markdown(f"📞 {telepon}")
+                with col3:
+                    st.markdown(f"💰 Rp {gaji:,.0f}")
+                st.markdown("---")
+    
+    def tabel_berhalaman(self, kunci, kolom, kolom_rupiah=(), kolom_cari=('Nama', 'Telepon'),
+                         filter=None):
+        """Tabel bersama: cari, urut dan halaman dikerjakan di server
+        
+        Hanya potongan yang terlihat yang dikirim ke browser; kolom rupiah
+        diformat lewat column_config, bukan string per baris.
+        """
+        col1, col2, col3, col4 = st.columns([3, 2, 1, 1])
+        with col1:
+            cari = st.text_input("🔍 Cari", key=f"{kunci}_cari",
+                                 placeholder=" / ".join(kolom_cari))
+        with col2:
+            urut = st.selectbox("Urutkan", [None, *kolom], key=f"{kunci}_urut",
+                                format_func=lambda k: "Urutan data" if k is None else k)
+        with col3:
+            menurun = st.toggle("Menurun", key=f"{kunci}_menurun", disabled=urut is None)
+        with col4:
+            ukuran_halaman = st.selectbox("Per halaman", [10, 25, 50, 100], index=1,
+                                          key=f"{kunci}_ukuran")
+        
+        argumen = dict(filter=filter, urut=urut, menurun=menurun,
+                       cari=cari.strip() or None, kolom_cari=kolom_cari)
+        # Nomor halaman dibaca sebelum widgetnya dibuat agar data cukup diambil sekali
+        kunci_halaman = f"{kunci}_halaman"
+        nomor = st.session_state.get(kunci_halaman, 1)
+        potongan, total = self.org_manager.halaman(
+            offset=(nomor - 1) * ukuran_halaman, batas=ukuran_halaman, **argumen)
+        jumlah_halaman = max(1, (total - 1) // ukuran_halaman + 1)
+        if nomor > jumlah_halaman:
+            # Hasil menyusut (cari/ukuran berubah): lompat ke halaman terakhir
+            nomor = st.session_state[kunci_halaman] = jumlah_halaman
+            potongan, total = self.org_manager.halaman(
+                offset=(nomor - 1) * ukuran_halaman, batas=ukuran_halaman, **argumen)
+        
+        if total == 0:
+            st.info("Tidak ada baris yang cocok.")
+            return
+        
+        st.dataframe(
+            potongan[list(kolom)],
+            use_container_width=True,
+            hide_index=True,
+            column_config={k: st.column_config.NumberColumn(k, format="Rp %,d")
+                           for k in kolom_rupiah}
+        )
+        col1, col2 = st.columns([3, 1])
+        with col1:
+            awal = (nomor - 1) * ukuran_halaman
+            st.caption(f"Menampilkan {awal + 1}-{awal + len(potongan)} dari {total} baris")
+        with col2:
+            st.number_input(f"Halaman (dari {jumlah_halaman})", min_value=1,
+                            max_value=jumlah_halaman, key=kunci_halaman)
+    
+    @ukur_waktu
     def halaman_anggaran(self):
         """Menampilkan informasi anggaran"""
         st.markdown('<div class="sub-header">💰 Analisis Anggaran Organisasi</div>', unsafe_allow_html=True)
@@ -263,33 +2553,84 @@ class AplikasiMasjidAshobirin:
             
             with col1:
                 # Grafik pie distribusi anggaran
-                fig_pie = self.viz_manager.grafik_gaji_divisi(data)
+                fig_pie = self.viz_manager.grafik_gaji_divisi(
+                    self.org_manager.ringkasan_divisi(), versi=self.org_manager.versi)
                 if fig_pie:
                     st.plotly_chart(fig_pie, use_container_width=True)
             
             with col2:
                 # Tabel ringkasan anggaran per divisi
                 st.markdown("### 📊 Ringkasan Anggaran per Divisi")
-                summary = data.groupby('Divisi').agg({
-                    'Gaji': ['sum', 'count']
-                }).round(0)
+                summary = self.org_manager.ringkasan_divisi().round(0)
                 summary.columns = ['Total Gaji', 'Jumlah Anggota']
                 summary['Rata-rata Gaji'] = (summary['Total Gaji'] / summary['Jumlah Anggota']).round(0)
                 
-                st.dataframe(summary.style.format({
-                    'Total Gaji': 'Rp {:.0f}',
-                    'Rata-rata Gaji': 'Rp {:.0f}'
-                }), use_container_width=True)
+                st.dataframe(summary, use_container_width=True, column_config={
+                    'Total Gaji': st.column_config.NumberColumn(format="Rp %,d"),
+                    'Rata-rata Gaji': st.column_config.NumberColumn(format="Rp %,d")
+                })
             
             # Detail anggaran
             st.markdown("### 📋 Detail Anggaran per Anggota")
-            display_data = data[['Nama', 'Jabatan', 'Divisi', 'Gaji']].copy()
-            display_data['Gaji'] = display_data['Gaji'].apply(lambda x: f"Rp {x:,.0f}")
-            st.dataframe(display_data, use_container_width=True)
+            self.tabel_berhalaman("anggaran", ['Nama', 'Jabatan', 'Divisi', 'Gaji'],
+                                  kolom_rupiah=['Gaji'], kolom_cari=('Nama',))
             
         else:
             st.warning("Tidak ada data anggaran untuk ditampilkan.")
+        
+        self.riwayat_anggaran()
     
+    def riwayat_anggaran(self):
+        """Anggaran dari waktu ke waktu dan anggaran pada tanggal tertentu, dari riwayat perubahan"""
+        awal = self.org_manager.riwayat.awal()
+        if awal is None:
+            return
+        
+        st.markdown("### 📈 Anggaran dari Waktu ke Waktu")
+        hari_ini = datetime.now().date()
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            dari = st.date_input("Dari", value=max(awal.date(), hari_ini - pd.Timedelta(days=90)),
+                                 min_value=awal.date(), max_value=hari_ini, key="riwayat_dari")
+        with col2:
+            sampai = st.date_input("Sampai", value=hari_ini, min_value=awal.date(),
+                                   max_value=hari_ini, key="riwayat_sampai")
+        with col3:
+            periode = st.selectbox("Periode", ["Harian", "Mingguan", "Bulanan"], index=1,
+                                   key="riwayat_periode")
+        
+        if dari > sampai:
+            st.warning("Tanggal awal harus sebelum tanggal akhir.")
+            return
+        frekuensi = {"Harian": "D", "Mingguan": "W", "Bulanan": "ME"}[periode]
+        # Tanggal akhir selalu ikut agar keadaan terbaru terlihat
+        daftar_tanggal = [*pd.date_range(dari, sampai, freq=frekuensi), pd.Timestamp(sampai)]
+        anggaran = self.org_manager.anggaran_per_periode(daftar_tanggal)
+        fig = self.viz_manager.grafik_anggaran_waktu(
+            anggaran, versi=(self.org_manager.versi, dari, sampai, periode))
+        if fig:
+            st.plotly_chart(fig, use_container_width=True)
+        
+        st.markdown("### 🕰️ Anggaran pada Tanggal Tertentu")
+        tanggal = st.date_input("Tanggal", value=hari_ini, min_value=awal.date(),
+                                max_value=hari_ini, key="riwayat_tanggal")
+        agregat = self.org_manager.agregat_pada(tanggal)
+        if agregat is None or agregat.jumlah == 0:
+            st.info("Belum ada anggota pada tanggal tersebut.")
+            return
+        
+        col1, col2 = st.columns(2)
+        with col1:
+            st.metric("Total Anggota", agregat.jumlah)
+        with col2:
+            st.metric("Total Anggaran", f"Rp {agregat.total_gaji:,.0f}")
+        ringkasan = agregat.ringkasan(agregat.per_divisi, 'Divisi')
+        ringkasan.columns = ['Total Gaji', 'Jumlah Anggota']
+        st.dataframe(ringkasan, use_container_width=True, column_config={
+            'Total Gaji': st.column_config.NumberColumn(format="Rp %,d")
+        })
+    
+    @ukur_waktu
     def halaman_laporan(self):
         """Menampilkan laporan dan data"""
         st.markdown('<div class="sub-header">📊 Laporan & Analisis Data</div>', unsafe_allow_html=True)
@@ -298,70 +2639,67 @@ class AplikasiMasjidAshobirin:
         
         if not data.empty:
             # Filter data
+            divisi_opsi = list(self.org_manager.agregat.per_divisi)
+            jabatan_opsi = list(self.org_manager.agregat.per_jabatan)
             col1, col2 = st.columns(2)
             with col1:
                 divisi_filter = st.multiselect(
                     "Pilih Divisi:",
-                    options=data['Divisi'].unique(),
-                    default=data['Divisi'].unique()
+                    options=divisi_opsi,
+                    default=divisi_opsi
                 )
             with col2:
                 jabatan_filter = st.multiselect(
                     "Pilih Jabatan:",
-                    options=data['Jabatan'].unique(),
-                    default=data['Jabatan'].unique()
+                    options=jabatan_opsi,
+                    default=jabatan_opsi
                 )
             
-            # Filter data
-            filtered_data = data[
-                (data['Divisi'].isin(divisi_filter)) & 
-                (data['Jabatan'].isin(jabatan_filter))
-            ]
+            # Filter data (indeks bitmap, hasil di-memo per filter dan versi data)
+            hasil_filter = self.org_manager.filter_laporan(divisi_filter, jabatan_filter)
+            filtered_data = hasil_filter['data']
             
             # Tampilkan metrik
             col1, col2, col3 = st.columns(3)
             with col1:
-                st.metric("Total Anggota Filter", len(filtered_data))
+                st.metric("Total Anggota Filter", hasil_filter['total_anggota'])
             with col2:
-                st.metric("Total Anggaran Filter", f"Rp {filtered_data['Gaji'].sum():,.0f}")
+                st.metric("Total Anggaran Filter", f"Rp {hasil_filter['total_gaji']:,.0f}")
             with col3:
-                st.metric("Rata-rata Gaji", f"Rp {filtered_data['Gaji'].mean():,.0f}")
+                st.metric("Rata-rata Gaji", f"Rp {hasil_filter['rata_rata_gaji']:,.0f}")
             
-            # Ekspor data
+            # Ekspor data: file dibuat saat tombol diklik, lalu di-cache per filter dan versi data
             st.markdown("### 💾 Ekspor Data")
-            col1, col2 = st.columns(2)
-            
-            with col1:
-                if st.button("📥 Download Data sebagai CSV"):
-                    csv = filtered_data.to_csv(index=False)
-                    st.download_button(
-                        label="Klik untuk Download CSV",
-                        data=csv,
-                        file_name=f"data_organisasi_masjid_{datetime.now().strftime('%Y%m%d')}.csv",
-                        mime="text/csv"
-                    )
+            kunci = (tuple(sorted(divisi_filter)), tuple(sorted(jabatan_filter)), self.org_manager.versi)
+            tanggal = datetime.now().strftime('%Y%m%d')
+            tombol = [
+                ('csv', "📥 Download Data sebagai CSV"),
+                ('excel', "📊 Download Data sebagai Excel"),
+                ('parquet', "🗄️ Download Data sebagai Parquet")
+            ]
             
-            with col2:
-                if st.button("📊 Download Data sebagai Excel"):
-                    output = io.BytesIO()
-                    with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
-                        filtered_data.to_excel(writer, index=False, sheet_name='Organisasi')
+            for kolom, (format, label) in zip(st.columns(len(tombol)), tombol):
+                ekstensi, mime = EksporManager.FORMAT[format]
+                with kolom:
                     st.download_button(
-                        label="Klik untuk Download Excel",
-                        data=output.getvalue(),
-                        file_name=f"data_organisasi_masjid_{datetime.now().strftime('%Y%m%d')}.xlsx",
-                        mime="application/vnd.ms-excel"
+                        label=label,
+                        data=lambda format=format: self.ekspor_manager.buka(filtered_data, format, kunci),
+                        file_name=f"data_organisasi_masjid_{tanggal}{ekstensi}",
+                        mime=mime,
+                        key=f"ekspor_{format}"
                     )
             
         else:
             st.info("Belum ada data untuk dianalisis.")
     
+    @ukur_waktu
     def halaman_kelola_data(self):
         """Halaman untuk mengelola data (CRUD)"""
         st.markdown('<div class="sub-header">⚙️ Kelola Data Organisasi</div>', unsafe_allow_html=True)
         
         # Tab untuk operasi CRUD
-        tab1, tab2, tab3 = st.tabs(["➕ Tambah Anggota", "✏️ Edit Anggota", "🗑️ Hapus Anggota"])
+        tab1, tab2, tab3, tab4 = st.tabs(["➕ Tambah Anggota", "✏️ Edit Anggota", "🗑️ Hapus Anggota",
+                                          "📤 Impor Anggota"])
         
         with tab1:
             self.form_tambah_anggota()
@@ -372,14 +2710,74 @@ class AplikasiMasjidAshobirin:
         with tab3:
             self.form_hapus_anggota()
         
+        with tab4:
+            self.form_impor_anggota()
+        
         # Tampilkan data saat ini
         st.markdown("### 📋 Data Saat Ini")
-        data = self.org_manager.get_all_data()
-        if not data.empty:
-            st.dataframe(data, use_container_width=True)
+        if not self.org_manager.get_all_data().empty:
+            self.tabel_berhalaman("kelola", list(KOLOM_ORGANISASI), kolom_rupiah=['Gaji'])
         else:
             st.info("Belum ada data organisasi.")
     
+    @ukur_waktu
+    def halaman_semua_masjid(self):
+        """Laporan gabungan seluruh masjid (tenant)"""
+        st.markdown('<div class="sub-header">🌐 Laporan Gabungan Semua Masjid</div>', unsafe_allow_html=True)
+        
+        if self.pengelola_tenant is None:
+            st.info("Aplikasi dijalankan dengan satu file data; laporan gabungan tidak tersedia.")
+            return
+        
+        laporan = self.pengelola_tenant.laporan_gabungan()
+        statistik = laporan['total'].statistik()
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric("Jumlah Masjid", len(laporan['per_masjid']))
+        with col2:
+            st.metric("Total Anggota", statistik['total_anggota'])
+        with col3:
+            st.metric("Total Anggaran", f"Rp {statistik['total_gaji']:,.0f}")
+        
+        rupiah = st.column_config.NumberColumn(format="Rp %,d")
+        st.markdown("### 🕌 Ringkasan per Masjid")
+        st.dataframe(laporan['per_masjid'], use_container_width=True,
+                     column_config={'Total Gaji': rupiah, 'Rata-rata Gaji': rupiah})
+        
+        st.markdown("### 💰 Anggaran per Divisi per Masjid")
+        st.dataframe(laporan['per_divisi'], use_container_width=True,
+                     column_config={d: rupiah for d in laporan['per_divisi'].columns})
+    
+    @ukur_waktu
+    def halaman_kinerja(self):
+        """Halaman admin: persentil durasi halaman dan operasi"""
+        st.markdown('<div class="sub-header">⏱️ Kinerja Aplikasi</div>', unsafe_allow_html=True)
+        
+        pencatat = get_pencatat_kinerja()
+        ringkasan = pencatat.ringkasan()
+        if ringkasan.empty:
+            st.info("Belum ada operasi yang tercatat.")
+        else:
+            st.caption(f"Persentil dihitung dari {pencatat.kapasitas} sampel terakhir per operasi")
+            st.dataframe(ringkasan.round(2), use_container_width=True, hide_index=True)
+        
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.download_button(
+                label="📥 Download Metrik Prometheus",
+                data=pencatat.ke_prometheus,
+                file_name="ashobirin.prom",
+                mime="text/plain"
+            )
+        with col2:
+            if pencatat.file_prometheus and st.button("💾 Tulis File Prometheus Sekarang"):
+                pencatat.tulis_prometheus(pencatat.file_prometheus)
+                st.success(f"✅ Metrik ditulis ke {pencatat.file_prometheus}")
+        with col3:
+            if st.button("🔄 Reset Metrik"):
+                pencatat.reset()
+                st.rerun()
+    
     def form_tambah_anggota(self):
         """Form untuk menambah anggota baru"""
         with st.form("form_tambah", clear_on_submit=True):
@@ -388,9 +2786,9 @@ class AplikasiMasjidAshobirin:
             with col1:
                 nama = st.text_input("Nama Lengkap *", placeholder="Masukkan nama lengkap")
                 jabatan = st.selectbox("Jabatan *", 
-                    ["Ketua", "Wakil Ketua", "Sekretaris", "Bendahara", "Koordinator", "Anggota"])
+                    DAFTAR_JABATAN)
                 divisi = st.selectbox("Divisi *",
-                    ["Takmir", "Dakwah", "Pendidikan", "Sosial", "Remaja", "Umum"])
+                    DAFTAR_DIVISI)
             
             with col2:
                 gaji = st.number_input("Gaji/Biaya Operasional (Rp) *", 
@@ -408,19 +2806,50 @@ class AplikasiMasjidAshobirin:
                 else:
                     st.error("❌ Harap isi semua field yang wajib!")
     
+    def pilih_anggota(self, label, key):
+        """Kotak cari dan selectbox hasil berperingkat, mengembalikan ID atau None
+        
+        Pilihan lama dibuang saat kata kunci berubah agar hasil teratas yang terpilih.
+        """
+        kueri = st.text_input("🔍 Cari anggota (nama / telepon)", key=f"{key}_cari",
+                              on_change=lambda: st.session_state.pop(key, None))
+        if kueri.strip():
+            opsi = self.org_manager.cari_anggota(kueri, batas=50)['ID'].tolist()
+            if not opsi:
+                st.info("Tidak ada anggota yang cocok dengan pencarian.")
+                return None
+        else:
+            opsi = self.org_manager.get_all_data()['ID'].values
+        return st.selectbox(
+            label,
+            options=opsi,
+            key=key,
+            format_func=lambda x: f"{self.org_manager.nama_anggota(x)} (ID: {x})"
+        )
+    
+    def versi_form(self, kunci, dikirim):
+        """``versi_disk`` saat form ``kunci`` terakhir ditampilkan (dasar deteksi ``KonflikVersi``)"""
+        nama = f"{kunci}_versi"
+        if not dikirim or nama not in st.session_state:
+            st.session_state[nama] = self.org_manager.versi_disk
+        return st.session_state[nama]
+    
+    def konflik_versi(self, kunci):
+        """Memberi tahu pengguna tentang konflik dan mencatat versi terbaru untuk form ``kunci``"""
+        self.org_manager.segarkan()
+        st.session_state[f"{kunci}_versi"] = self.org_manager.versi_disk
+        st.error("❌ Data sudah diubah oleh pengguna lain sejak form ini dibuka. "
+                 "Periksa data terbaru lalu simpan lagi.")
+    
     def form_edit_anggota(self):
         """Form untuk mengedit data anggota"""
         data = self.org_manager.get_all_data()
         
         if not data.empty:
-            pilihan_anggota = st.selectbox(
-                "Pilih Anggota untuk Edit:",
-                options=data['ID'].values,
-                format_func=lambda x: f"{data[data['ID']==x]['Nama'].iloc[0]} (ID: {x})"
-            )
+            pilihan_anggota = self.pilih_anggota("Pilih Anggota untuk Edit:", key="edit_select")
             
             if pilihan_anggota:
-                anggota_data = data[data['ID'] == pilihan_anggota].iloc[0]
+                anggota_data = self.org_manager.get_anggota(pilihan_anggota)
                 
                 with st.form("form_edit"):
                     col1, col2 = st.columns(2)
@@ -428,24 +2857,33 @@ class AplikasiMasjidAshobirin:
                     with col1:
                         nama = st.text_input("Nama Lengkap", value=anggota_data['Nama'])
                         jabatan = st.selectbox("Jabatan", 
-                            ["Ketua", "Wakil Ketua", "Sekretaris", "Bendahara", "Koordinator", "Anggota"],
-                            index=["Ketua", "Wakil Ketua", "Sekretaris", "Bendahara", "Koordinator", "Anggota"].index(anggota_data['Jabatan']))
+                            DAFTAR_JABATAN,
+                            index=DAFTAR_JABATAN.index(anggota_data['Jabatan']))
                         divisi = st.selectbox("Divisi",
-                            ["Takmir", "Dakwah", "Pendidikan", "Sosial", "Remaja", "Umum"],
-                            index=["Takmir", "Dakwah", "Pendidikan", "Sosial", "Remaja", "Umum"].index(anggota_data['Divisi']))
+                            DAFTAR_DIVISI,
+                            index=DAFTAR_DIVISI.index(anggota_data['Divisi']))
                     
                     with col2:
                         gaji = st.number_input("Gaji/Biaya Operasional (Rp)", 
                             min_value=0, value=int(anggota_data['Gaji']), step=100000)
-                        telepon = st.text_input("Nomor Telepon", value=anggota_data['Telepon'])
+                        telepon = st.text_input("Nomor Telepon",
+                            value="" if pd.isna(anggota_data['Telepon']) else anggota_data['Telepon'])
                     
                     submitted = st.form_submit_button("✏️ Update Data")
+                    versi = self.versi_form("form_edit", submitted)
                     
                     if submitted:
                         if nama and jabatan and divisi:
-                            if self.org_manager.edit_anggota(pilihan_anggota, nama, jabatan, divisi, gaji, telepon):
-                                st.success("✅ Data anggota berhasil diupdate!")
-                                st.rerun()
+                            try:
+                                berhasil = self.org_manager.edit_anggota(
+                                    pilihan_anggota, nama, jabatan, divisi, gaji, telepon,
+                                    versi_diharapkan=versi)
+                            except KonflikVersi:
+                                self.konflik_versi("form_edit")
+                            else:
+                                if berhasil:
+                                    st.success("✅ Data anggota berhasil diupdate!")
+                                    st.rerun()
                         else:
                             st.error("❌ Harap isi semua field yang wajib!")
         else:
@@ -456,25 +2894,57 @@ class AplikasiMasjidAshobirin:
         data = self.org_manager.get_all_data()
         
         if not data.empty:
-            pilihan_hapus = st.selectbox(
-                "Pilih Anggota untuk Dihapus:",
-                options=data['ID'].values,
-                key="hapus_select",
-                format_func=lambda x: f"{data[data['ID']==x]['Nama'].iloc[0]} (ID: {x})"
-            )
+            pilihan_hapus = self.pilih_anggota("Pilih Anggota untuk Dihapus:", key="hapus_select")
             
             if pilihan_hapus:
-                anggota_data = data[data['ID'] == pilihan_hapus].iloc[0]
+                anggota_data = self.org_manager.get_anggota(pilihan_hapus)
                 
                 st.warning(f"⚠️ Anda akan menghapus data: **{anggota_data['Nama']}** ({anggota_data['Jabatan']} - {anggota_data['Divisi']})")
                 
-                if st.button("🗑️ Hapus Permanen", type="primary"):
-                    if self.org_manager.hapus_anggota(pilihan_hapus):
-                        st.success("✅ Data anggota berhasil dihapus!")
-                        st.rerun()
+                dikirim = st.button("🗑️ Hapus Permanen", type="primary")
+                versi = self.versi_form("form_hapus", dikirim)
+                if dikirim:
+                    try:
+                        berhasil = self.org_manager.hapus_anggota(pilihan_hapus,
+                                                                  versi_diharapkan=versi)
+                    except KonflikVersi:
+                        self.konflik_versi("form_hapus")
+                    else:
+                        if berhasil:
+                            st.success("✅ Data anggota berhasil dihapus!")
+                            st.rerun()
         else:
             st.info("Belum ada data untuk dihapus.")
     
+    def form_impor_anggota(self):
+        """Form untuk impor banyak anggota dari file CSV/Excel"""
+        st.markdown("Kolom yang dibaca: **Nama, Jabatan, Divisi, Gaji, Telepon**")
+        berkas = st.file_uploader("Pilih file CSV atau Excel", type=["csv", "xlsx"],
+                                  key="impor_berkas")
+        
+        if berkas is not None:
+            try:
+                if berkas.name.lower().endswith(".xlsx"):
+                    batch = pd.read_excel(berkas, dtype={'Telepon': str})
+                else:
+                    batch = pd.read_csv(berkas, dtype={'Telepon': str})
+            except Exception as e:
+                st.error(f"❌ File tidak dapat dibaca: {e}")
+                return
+            
+            st.markdown(f"**{len(batch)}** baris ditemukan. Pratinjau:")
+            st.dataframe(batch.head(20), use_container_width=True)
+            
+            if st.button("📤 Impor Data", type="primary"):
+                hasil = self.org_manager.tambah_anggota_batch(batch)
+                st.success(
+                    f"✅ {hasil['ditambah']} anggota berhasil diimpor dalam "
+                    f"{hasil['detik']:.2f} detik ({hasil['baris_per_detik']:,.0f} baris/detik)"
+                )
+                if not hasil['ditolak'].empty:
+                    st.warning(f"⚠️ {len(hasil['ditolak'])} baris ditolak:")
+                    st.dataframe(hasil['ditolak'], use_container_width=True)
+    
     def run(self):
         """Menjalankan aplikasi utama"""
         selected = self.sidebar_navigation()
@@ -490,6 +2960,10 @@ class AplikasiMasjidAshobirin:
             self.halaman_laporan()
         elif selected == "⚙️ Kelola Data":
             self.halaman_kelola_data()
+        elif selected == "🌐 Semua Masjid":
+            self.halaman_semua_masjid()
+        elif selected == "⏱️ Kinerja":
+            self.halaman_kinerja()
 
 # ===============================
 # MENJALANKAN APLIKASI
@@ -0,0 +1,472 @@
+"""Benchmark skala aplikasi Masjid Ashobirin
+
+Membuat roster sintetis ``data_organisasi.csv`` (1k sampai 1M baris), lalu
+mengukur waktu ``DataManager.load_data``/``save_data``, ketiga mutasi
+``OrganisasiManager`` dan pencariannya, kedua grafik ``VisualisasiManager``, render setiap
+halaman ``AplikasiMasjidAshobirin`` secara headless lewat AppTest Streamlit.
+Waktu sampai render pertama (Beranda, proses Python baru) dibandingkan dengan
+``--anggaran-startup``; run gagal jika anggaran terlampaui atau jika
+plotly.express ikut termuat di Beranda. Waktu render pemilih anggota (edit/hapus)
+per opsi dibandingkan antara roster ``--cek-picker`` terkecil dan terbesar; run
+gagal jika naik lebih dari ``--toleransi-picker`` kali (render tidak lagi linear)
+atau jika pilihannya tidak berpindah ke hasil teratas setelah kata kunci berubah.
+Uji stres menjalankan ``--stres-proses`` proses penulis bersamaan pada backend CSV
+dan SQLite; run gagal jika ada baris hilang/berlebih, ID ganda atau edit hilang.
+Cek jurnal robek menulis sesudah baris jurnal/riwayat yang terpotong crash; run
+gagal jika ada tulisan yang hilang setelah dimuat ulang. Cek cekpoin menghitung
+snapshot riwayat setelah roster dibaca, setelah 20x ``save_data`` dan setelah
+pemangkasan; run gagal jika jumlahnya ikut tumbuh atau keadaan terakhir salah.
+Hasil ditulis ke file JSON agar bisa dibandingkan antar-run.
+
+Contoh:
+    python benchmark_ashobirin.py --ukuran 1000 10000 --output hasil.json
+    python benchmark_ashobirin.py --banding hasil_lama.json --toleransi 0.2
+"""
+import argparse
+import importlib
+import json
+import multiprocessing
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from ashobirin import (
+    DAFTAR_DIVISI,
+    DAFTAR_JABATAN,
+    OrganisasiManager,
+    VisualisasiManager,
+)
+
+# Nama menu di sidebar_navigation yang dirender oleh benchmark
+HALAMAN = [
+    "🏠 Beranda",
+    "👥 Struktur Organisasi",
+    "💰 Anggaran",
+    "📊 Data & Laporan",
+    "⚙️ Kelola Data",
+    "🌐 Semua Masjid",
+    "⏱️ Kinerja"
+]
+
+# Skrip AppTest: navigasi option_menu (komponen kustom) diganti pilihan tetap,
+# dan st.image dilewati karena gambar lokal tidak tersedia saat headless
+SKRIP_HALAMAN = '''
+import streamlit as st
+import ashobirin
+st.image = lambda *args, **kwargs: None
+ashobirin.AplikasiMasjidAshobirin.sidebar_navigation = lambda self: {halaman!r}
+ashobirin.AplikasiMasjidAshobirin({filename!r}).run()
+'''
+
+# Dijalankan di proses Python baru: waktu render pertama Beranda, termasuk impor ashobirin
+SKRIP_STARTUP = '''
+import json, sys, time
+from streamlit.testing.v1 import AppTest
+app = AppTest.from_string({skrip!r}, default_timeout={batas_waktu!r})
+mulai = time.perf_counter()
+app.run()
+print(json.dumps({{
+    "detik": time.perf_counter() - mulai,
+    "plotly_express": "plotly.express" in sys.modules,
+    "error": [str(e.value) for e in app.exception]
+}}))
+'''
+
+# Hanya pemilih anggota form edit yang dirender (selectbox berisi semua anggota)
+SKRIP_PICKER = '''
+import ashobirin
+app = ashobirin.AplikasiMasjidAshobirin({filename!r})
+app.pilih_anggota("Pilih Anggota untuk Edit:", key="edit_select")
+'''
+
+def buat_roster(jumlah, filename, seed=0):
+    """Menulis roster sintetis berisi `jumlah` anggota ke file CSV"""
+    rng = np.random.default_rng(seed)
+    ids = np.arange(1, jumlah + 1)
+    tanggal = pd.Timestamp("2015-01-01") + pd.to_timedelta(rng.integers(0, 3650, jumlah), unit="D")
+    roster = pd.DataFrame({
+        'ID': ids,
+        'Nama': pd.Series(ids).map("Anggota {}".format),
+        'Jabatan': rng.choice(DAFTAR_JABATAN, jumlah),
+        'Divisi': rng.choice(DAFTAR_DIVISI, jumlah),
+        'Gaji': rng.integers(10, 200, jumlah) * 50000,
+        'Telepon': pd.Series(rng.integers(0, 10**10, jumlah)).map("08{:010d}".format),
+        'Tanggal_Bergabung': tanggal.strftime("%Y-%m-%d")
+    })
+    roster.to_csv(filename, index=False)
+    return filename
+
+def ukur(fungsi, ulang=5):
+    """Median durasi (detik) dari beberapa kali pemanggilan fungsi"""
+    durasi = []
+    for _ in range(ulang):
+        mulai = time.perf_counter()
+        fungsi()
+        durasi.append(time.perf_counter() - mulai)
+    return statistics.median(durasi)
+
+def bench_data(filename, ulang):
+    """Benchmark lapisan data dan visualisasi untuk satu file roster"""
+    hasil = {}
+    manager = OrganisasiManager(filename)
+    hasil['load_data'] = ukur(manager.load_data, ulang)
+    hasil['save_data'] = ukur(manager.save_data, ulang)
+    
+    id_baru = []
+    def tambah():
+        manager.tambah_anggota("Benchmark", "Anggota", "Umum", 1000000, "081234567890")
+        id_baru.append(max(manager._indeks_id))
+    hasil['tambah_anggota'] = ukur(tambah, ulang)
+    
+    id_contoh = next(iter(manager._indeks_id))
+    hasil['edit_anggota'] = ukur(
+        lambda: manager.edit_anggota(id_contoh, "Benchmark Edit", "Koordinator", "Sosial",
+                                     2000000, "081234567891"),
+        ulang
+    )
+    hasil['hapus_anggota'] = ukur(lambda: manager.hapus_anggota(id_baru.pop()), ulang)
+    # Kueri dengan salah ketik (indeks trigram Nama/Telepon)
+    hasil['cari_anggota'] = ukur(lambda: manager.cari_anggota("angota 12", batas=20), ulang)
+    
+    # Figure dibangun tanpa cache (versi=None) agar yang terukur adalah konstruksinya
+    viz = VisualisasiManager()
+    ringkasan_divisi = manager.ringkasan_divisi()
+    ringkasan_jabatan = manager.ringkasan_jabatan()
+    hasil['grafik_gaji_divisi'] = ukur(lambda: viz.grafik_gaji_divisi(ringkasan_divisi), ulang)
+    hasil['grafik_struktur_organisasi'] = ukur(
+        lambda: viz.grafik_struktur_organisasi(ringkasan_jabatan), ulang
+    )
+    return hasil
+
+def bench_halaman(filename, ulang, batas_waktu):
+    """Render setiap halaman lewat AppTest: run pertama (dingin) dan median run berikutnya"""
+    from streamlit.testing.v1 import AppTest
+    
+    hasil = {}
+    for halaman in HALAMAN:
+        skrip = SKRIP_HALAMAN.format(halaman=halaman, filename=os.path.abspath(filename))
+        app = AppTest.from_string(skrip, default_timeout=batas_waktu)
+        
+        mulai = time.perf_counter()
+        app.run()
+        dingin = time.perf_counter() - mulai
+        hangat = ukur(app.run, ulang)
+        
+        hasil[halaman] = {
+            'dingin': dingin,
+            'hangat': hangat,
+            'error': [str(e.value) for e in app.exception]
+        }
+    return hasil
+
+def ukur_picker(filename, ulang, batas_waktu):
+    """Median waktu render pemilih anggota (run hangat) dan waktunya per opsi"""
+    from streamlit.testing.v1 import AppTest
+    
+    app = AppTest.from_string(SKRIP_PICKER.format(filename=os.path.abspath(filename)),
+                              default_timeout=batas_waktu)
+    app.run()
+    detik = ukur(app.run, ulang)
+    opsi = len(app.selectbox(key="edit_select").options)
+    return {
+        'opsi': opsi,
+        'detik': detik,
+        'mikrodetik_per_opsi': detik / max(opsi, 1) * 1e6,
+        'error': [str(e.value) for e in app.exception]
+    }
+
+def cek_pemilih_cari(filename, batas_waktu):
+    """Setelah kata kunci berubah, pemilih anggota harus memilih hasil teratas, bukan pilihan lama"""
+    from streamlit.testing.v1 import AppTest
+    
+    app = AppTest.from_string(SKRIP_PICKER.format(filename=os.path.abspath(filename)),
+                              default_timeout=batas_waktu)
+    app.run()
+    manager = OrganisasiManager(filename)
+    salah = []
+    for kueri in ("anggota 7", "anggota 70"):
+        # Pilih dulu anggota yang ikut cocok dengan kata kunci tetapi bukan yang teratas
+        hasil = manager.cari_anggota(kueri, batas=50)['ID'].tolist()
+        app.text_input(key="edit_select_cari").set_value("").run()
+        app.selectbox(key="edit_select").set_value(hasil[-1]).run()
+        app.text_input(key="edit_select_cari").set_value(kueri).run()
+        terpilih = app.selectbox(key="edit_select").value
+        if terpilih != hasil[0]:
+            salah.append({'kueri': kueri, 'terpilih': terpilih, 'teratas': hasil[0]})
+    return {'salah': salah, 'error': [str(e.value) for e in app.exception]}
+
+def pekerja_stres(args):
+    """Proses penulis uji stres: tambah, edit dan hapus anggota miliknya sendiri
+    
+    Mengembalikan (keadaan akhir yang diharapkan {nama: gaji}, jumlah tulisan, detik).
+    """
+    filename, nomor, jumlah = args
+    manager = OrganisasiManager(filename)
+    manager.penyimpanan.batas_jurnal = 100  # kompaksi ikut teruji (backend CSV)
+    
+    def id_dari_nama(nama):
+        return int(manager.data.loc[manager.data['Nama'] == nama, 'ID'].iloc[0])
+    
+    harapan = {}
+    tulisan = 0
+    mulai = time.perf_counter()
+    for i in range(jumlah):
+        nama = f"Stres {nomor}-{i}"
+        manager.tambah_anggota(nama, "Anggota", "Umum", 1000, "081200000000")
+        harapan[nama] = 1000
+        tulisan += 1
+        if i % 3 == 1:
+            lama = f"Stres {nomor}-{i - 1}"
+            if lama in harapan:
+                manager.edit_anggota(id_dari_nama(lama), lama, "Koordinator", "Sosial",
+                                     2000 + i, "081200000000")
+                harapan[lama] = 2000 + i
+                tulisan += 1
+        if i % 5 == 4:
+            lama = f"Stres {nomor}-{i - 4}"
+            manager.hapus_anggota(id_dari_nama(lama))
+            del harapan[lama]
+            tulisan += 1
+    if hasattr(manager.penyimpanan, 'tunggu_kompaksi'):
+        manager.penyimpanan.tunggu_kompaksi()
+    return harapan, tulisan, time.perf_counter() - mulai
+
+def cek_stres(filename, proses, jumlah):
+    """Beberapa proses menulis bersamaan; hitung baris hilang/berlebih, ID ganda dan edit hilang"""
+    # AppTest yang sudah berjalan di proses ini (cek picker) mengganti
+    # sys.modules['__main__'] dengan skrip sementaranya, sehingga pickle tidak
+    # menemukan __main__.pekerja_stres; pekerja dirujuk lewat modul ini yang diimpor ulang
+    modul = importlib.import_module(os.path.splitext(os.path.basename(__file__))[0])
+    konteks = multiprocessing.get_context("spawn")
+    with konteks.Pool(proses) as pool:
+        hasil = pool.map(modul.pekerja_stres, [(filename, nomor, jumlah) for nomor in range(proses)])
+    
+    harapan = {}
+    for bagian, _, _ in hasil:
+        harapan.update(bagian)
+    data = OrganisasiManager(filename).get_all_data()
+    stres = data[data['Nama'].astype(str).str.startswith("Stres ")]
+    aktual = dict(zip(stres['Nama'].astype(str), stres['Gaji'].astype(int)))
+    return {
+        'baris': len(stres),
+        'hilang': len(harapan.keys() - aktual.keys()),
+        'berlebih': len(aktual.keys() - harapan.keys()),
+        'id_ganda': int(data['ID'].duplicated().sum()),
+        'edit_hilang': sum(1 for nama, gaji in harapan.items()
+                           if nama in aktual and aktual[nama] != gaji),
+        'tulis_per_detik': sum(t for _, t, _ in hasil) / max(d for _, _, d in hasil)
+    }
+
+def cek_jurnal_robek(folder):
+    """Tulisan sesudah crash yang memotong baris terakhir jurnal/riwayat harus tetap terbaca"""
+    filename = os.path.join(folder, "data_organisasi.csv")
+    OrganisasiManager(filename).tambah_anggota("Robek A", "Anggota", "Umum", 1000, "0812")
+    for nama in (filename + ".jurnal", filename + ".riwayat"):
+        with open(nama, "a", encoding="utf-8") as f:
+            f.write('{"op": "tambah", "data": {"ID": 99, "Na')
+    
+    manager = OrganisasiManager(filename)
+    manager.tambah_anggota("Robek B", "Anggota", "Umum", 1000, "0812")
+    manager.tambah_anggota("Robek C", "Anggota", "Umum", 1000, "0812")
+    harapan = {"Robek A", "Robek B", "Robek C"}
+    di_data = set(OrganisasiManager(filename).get_all_data()['Nama'].astype(str))
+    di_riwayat = {e['data'].get('Nama') for e in manager.riwayat.perubahan() if e['op'] == 'tambah'}
+    return {
+        'hilang_data': sorted(harapan - di_data),
+        'hilang_riwayat': sorted(harapan - di_riwayat)
+    }
+
+def cek_cekpoin(folder, simpan=20, maks=3):
+    """Jumlah cekpoin riwayat harus terbatas: tidak bertambah saat dibaca atau per ``save_data``"""
+    filename = buat_roster(500, os.path.join(folder, "data_organisasi.csv"))
+    manager = OrganisasiManager(filename)
+    setelah_muat = len(manager.riwayat.daftar_cekpoin())
+    for i in range(simpan):
+        manager.data.loc[i, 'Gaji'] = 999
+        manager.save_data()
+    setelah_simpan = len(manager.riwayat.daftar_cekpoin())
+    
+    # Cekpoin sesudah setiap edit, lalu dipangkas ke `maks`
+    manager.riwayat.maks_cekpoin = maks
+    for i in range(10):
+        manager.edit_anggota(int(manager.data['ID'].iloc[i]), f"Cekpoin {i}", "Anggota", "Umum", 150, "0812")
+        with manager.transaksi():
+            manager.riwayat.cekpoin(manager.data)
+    daftar = manager.riwayat.daftar_cekpoin()
+    file_cekpoin = [f for f in os.listdir(manager.riwayat.folder_cekpoin) if f.endswith(".csv")]
+    sekarang = manager.riwayat.keadaan_pada(pd.Timestamp.now() + pd.Timedelta(days=1))
+    return {
+        'setelah_muat': setelah_muat,
+        'setelah_simpan': setelah_simpan,
+        'setelah_pangkas': len(daftar),
+        'file_cekpoin': len(file_cekpoin),
+        'selisih_gaji': int(pd.to_numeric(sekarang['Gaji']).sum() - manager.data['Gaji'].sum())
+    }
+
+def ukur_startup(filename, batas_waktu):
+    """Waktu sampai render pertama halaman Beranda di proses Python baru"""
+    skrip = SKRIP_HALAMAN.format(halaman=HALAMAN[0], filename=os.path.abspath(filename))
+    proses = subprocess.run(
+        [sys.executable, "-c", SKRIP_STARTUP.format(skrip=skrip, batas_waktu=batas_waktu)],
+        capture_output=True, text=True, check=True,
+        cwd=os.path.dirname(os.path.abspath(__file__))
+    )
+    return json.loads(proses.stdout.strip().splitlines()[-1])
+
+def banding(hasil, lama, toleransi):
+    """Daftar metrik yang melambat lebih dari `toleransi` (rasio) dibanding hasil lama"""
+    def ratakan(d, awalan=""):
+        for kunci, nilai in d.items():
+            if isinstance(nilai, dict):
+                yield from ratakan(nilai, f"{awalan}{kunci}/")
+            elif isinstance(nilai, (int, float)):
+                yield f"{awalan}{kunci}", nilai
+    
+    baru = dict(ratakan(hasil['hasil']))
+    sebelum = dict(ratakan(lama['hasil']))
+    regresi = []
+    for nama, nilai in baru.items():
+        if nama in sebelum and sebelum[nama] > 0 and nilai > sebelum[nama] * (1 + toleransi):
+            regresi.append((nama, sebelum[nama], nilai))
+    return regresi
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--ukuran", type=int, nargs="+", default=[1000, 10000, 100000, 1000000],
+                        help="jumlah baris roster yang diuji")
+    parser.add_argument("--ulang", type=int, default=5, help="jumlah pengulangan per pengukuran")
+    parser.add_argument("--maks-halaman", type=int, default=100000,
+                        help="render halaman hanya untuk roster sampai ukuran ini")
+    parser.add_argument("--batas-waktu", type=float, default=600,
+                        help="batas waktu render satu halaman (detik)")
+    parser.add_argument("--anggaran-startup", type=float, default=2.0,
+                        help="batas waktu render pertama Beranda (detik) sebelum dianggap regresi")
+    parser.add_argument("--cek-picker", type=int, nargs="+", default=[1000, 50000],
+                        help="ukuran roster untuk cek render pemilih anggota")
+    parser.add_argument("--toleransi-picker", type=float, default=3.0,
+                        help="rasio maksimum waktu per opsi roster terbesar terhadap terkecil")
+    parser.add_argument("--stres-proses", type=int, default=6,
+                        help="jumlah proses penulis bersamaan pada uji stres (0 = lewati)")
+    parser.add_argument("--stres-tulis", type=int, default=300,
+                        help="jumlah anggota yang ditambahkan tiap proses pada uji stres")
+    parser.add_argument("--output", default="hasil_benchmark.json")
+    parser.add_argument("--banding", help="file JSON hasil lama untuk deteksi regresi")
+    parser.add_argument("--toleransi", type=float, default=0.2,
+                        help="rasio perlambatan yang masih diterima saat membandingkan")
+    args = parser.parse_args(argv)
+    
+    laporan = {
+        'waktu': datetime.now().isoformat(timespec="seconds"),
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'hasil': {}
+    }
+    
+    folder = tempfile.mkdtemp(prefix="ashobirin-bench-")
+    gagal = False
+    try:
+        roster_startup = buat_roster(min(args.ukuran), os.path.join(folder, "startup.csv"))
+        laporan['startup'] = ukur_startup(roster_startup, args.batas_waktu)
+        print(f"== startup: {laporan['startup']['detik']:.3f} detik sampai render pertama")
+        if laporan['startup']['detik'] > args.anggaran_startup:
+            print(f"ANGGARAN STARTUP TERLAMPAUI: {laporan['startup']['detik']:.3f}s "
+                  f"> {args.anggaran_startup:.3f}s")
+            gagal = True
+        if laporan['startup']['plotly_express']:
+            print("REGRESI: plotly.express dimuat saat render Beranda")
+            gagal = True
+        
+        laporan['picker'] = {}
+        for jumlah in args.cek_picker:
+            sub = os.path.join(folder, f"picker-{jumlah}")
+            os.makedirs(sub)
+            roster = buat_roster(jumlah, os.path.join(sub, "data_organisasi.csv"))
+            laporan['picker'][str(jumlah)] = ukur_picker(roster, args.ulang, args.batas_waktu)
+            print(f"== picker {jumlah} anggota: "
+                  f"{laporan['picker'][str(jumlah)]['mikrodetik_per_opsi']:.2f} µs per opsi")
+            if laporan['picker'][str(jumlah)]['error']:
+                print(f"ERROR picker {jumlah}: {laporan['picker'][str(jumlah)]['error']}")
+                gagal = True
+        kecil = laporan['picker'][str(min(args.cek_picker))]['mikrodetik_per_opsi']
+        besar = laporan['picker'][str(max(args.cek_picker))]['mikrodetik_per_opsi']
+        if besar > kecil * args.toleransi_picker:
+            print(f"REGRESI: render pemilih anggota tidak linear ({kecil:.2f} -> {besar:.2f} µs per opsi)")
+            gagal = True
+        
+        laporan['pemilih_cari'] = cek_pemilih_cari(
+            os.path.join(folder, f"picker-{min(args.cek_picker)}", "data_organisasi.csv"),
+            args.batas_waktu)
+        if laporan['pemilih_cari']['salah'] or laporan['pemilih_cari']['error']:
+            print(f"REGRESI: pemilih anggota tidak mengikuti pencarian: {laporan['pemilih_cari']}")
+            gagal = True
+        
+        laporan['stres'] = {}
+        for ekstensi in (".csv", ".db") if args.stres_proses > 0 else ():
+            sub = os.path.join(folder, f"stres{ekstensi}")
+            os.makedirs(sub)
+            # Backend .db memigrasikan roster awal dari CSV bernama sama
+            buat_roster(100, os.path.join(sub, "data_organisasi.csv"))
+            stres = cek_stres(os.path.join(sub, "data_organisasi" + ekstensi),
+                              args.stres_proses, args.stres_tulis)
+            laporan['stres'][ekstensi] = stres
+            print(f"== stres {ekstensi}: {stres['baris']} baris, "
+                  f"{stres['tulis_per_detik']:.0f} tulisan/detik")
+            if stres['hilang'] or stres['berlebih'] or stres['id_ganda'] or stres['edit_hilang']:
+                print(f"REGRESI: penulisan bersamaan tidak aman pada {ekstensi}: {stres}")
+                gagal = True
+        
+        sub = os.path.join(folder, "jurnal-robek")
+        os.makedirs(sub)
+        laporan['jurnal_robek'] = cek_jurnal_robek(sub)
+        if any(laporan['jurnal_robek'].values()):
+            print(f"REGRESI: tulisan sesudah baris jurnal terpotong hilang: {laporan['jurnal_robek']}")
+            gagal = True
+        
+        sub = os.path.join(folder, "cekpoin")
+        os.makedirs(sub)
+        cekpoin = laporan['cekpoin'] = cek_cekpoin(sub)
+        print(f"== cekpoin: {cekpoin['setelah_muat']} setelah muat, {cekpoin['setelah_simpan']} "
+              f"setelah 20x save_data, {cekpoin['setelah_pangkas']} setelah dipangkas")
+        if (cekpoin['setelah_muat'] or cekpoin['setelah_simpan'] > 1 or cekpoin['setelah_pangkas'] > 3
+                or cekpoin['file_cekpoin'] != cekpoin['setelah_pangkas'] or cekpoin['selisih_gaji']):
+            print(f"REGRESI: cekpoin riwayat tidak terbatas atau salah: {cekpoin}")
+            gagal = True
+        
+        for jumlah in args.ukuran:
+            print(f"== {jumlah} baris")
+            sub = os.path.join(folder, str(jumlah))
+            os.makedirs(sub)
+            filename = buat_roster(jumlah, os.path.join(sub, "data_organisasi.csv"))
+            
+            hasil = bench_data(filename, args.ulang)
+            if jumlah <= args.maks_halaman:
+                hasil['halaman'] = bench_halaman(filename, args.ulang, args.batas_waktu)
+            laporan['hasil'][str(jumlah)] = hasil
+            print(json.dumps(hasil, indent=2, ensure_ascii=False))
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
+    
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(laporan, f, indent=2, ensure_ascii=False)
+    print(f"Hasil ditulis ke {args.output}")
+    
+    if args.banding:
+        with open(args.banding, encoding="utf-8") as f:
+            lama = json.load(f)
+        regresi = banding(laporan, lama, args.toleransi)
+        for nama, sebelum, sesudah in regresi:
+            print(f"REGRESI {nama}: {sebelum:.4f}s -> {sesudah:.4f}s")
+        gagal = gagal or bool(regresi)
+    return 1 if gagal else 0
+
+if __name__ == "__main__":
+    sys.exit(main())